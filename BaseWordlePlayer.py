@@ -1,4 +1,8 @@
+import time
 import random
+from GuessCache import GuessCache
+from GameState import GameState
+from ConstraintIndex import ConstraintIndex
 from utility import _get_output_path
 
 
@@ -8,23 +12,64 @@ class BaseWordlePlayer():
             k: length of each word
             m: length of the guess list
             n: length of the Wordle list
+
+        The available candidates during a game are kept as
+            a sorted array of indices of the Wordle list
+
+        The user is asked for an own guess at each step when playing verbosely,
+            unless the player picks its guesses by itself (manual_guess = False)
+
+        Each turn of the games is measured if a profiler is set (see PlayProfiler),
+            otherwise the cost is a check of the profiler per phase
+
+        In hard mode, every guess must be consistent with all previous hints,
+            the legal guess words of a game are kept as a mask over the guess list
+            (see ConstraintIndex and GameState)
     """
+    manual_guess = True
 
-    def __init__(self, wordle, guess_list=None):
+    def __init__(self, wordle, guess_list=None, guess_cache_size=0):
         """
             Initialize
                 wordle: an Wordle object
                 guess_list: (list of str)
                     the list of words to guess from, default None
+                guess_cache_size: (int)
+                    the maximum number of game states to memoize the picked guess for
+                    (see GuessCache), only for players that give the same guess
+                    for the same game state, default 0 (disabled)
         """
         self.wordle = wordle
         if guess_list is not None:
-            self.guess_list = [w for w in guess_list if len(w) == self.wordle.k]
+            self.guess_list = [w.lower() for w in guess_list if len(w) == self.wordle.k]
         else:
             self.guess_list = self.wordle.words.copy()
         if not self.guess_list:
             raise ValueError(
                 "<guess_list> does not contain {}-letter words!".format(self.wordle.k))
+        self.guess_cache = GuessCache(guess_cache_size) if guess_cache_size else None
+        self.profiler = None
+        # the number of guess words scored by the last give_guess, if it scores fewer than all of them
+        self.num_scored = None
+        self._constraint_index = None
+
+    def __getstate__(self):
+        """
+            Pickle without the profiler (which only measures games in this process)
+        """
+        state = self.__dict__.copy()
+        state["profiler"] = None
+        return state
+
+    @property
+    def constraint_index(self):
+        """
+            The constraint index of the guess list for hard mode (see ConstraintIndex),
+                built on first use
+        """
+        if self._constraint_index is None:
+            self._constraint_index = ConstraintIndex(self.wordle, self.guess_list)
+        return self._constraint_index
 
     def reset(self):
         """
@@ -32,6 +77,20 @@ class BaseWordlePlayer():
         """
         pass
 
+    def snapshot(self):
+        """
+            Return:
+                the variables that depend on the current candidates
+                (restored before playing a turn of a game, see GameState)
+        """
+        return None
+
+    def restore(self, snapshot):
+        """
+            Restore the variables from a snapshot
+        """
+        pass
+
     def compute_score(self, word):
         """
             Return:
@@ -39,16 +98,16 @@ class BaseWordlePlayer():
         """
         return -1
 
-    def give_guess(self, guess_words, candidates, history, fixed_guess=None, verbose=True):
+    def give_guess(self, guess_words, candidates, history, fixed_guess=None, verbose=False):
         """
            A simple way to provide a guess word:
-                either through the user input or the word is generated randomly
+                the word is generated randomly
 
             Parameters:
                 guess_words: (list of str)
                     the default list of words for guessing
-                candidates:
-                    the candidate words that satisfy the target conditions
+                candidates: (array of int)
+                    the indices of the candidate words that satisfy the target conditions
                 history:
                     previous guess words
                 (optional) fixed_guess:
@@ -62,18 +121,84 @@ class BaseWordlePlayer():
         if fixed_guess is not None:
             return fixed_guess, self.compute_score(fixed_guess)
 
-        if verbose:
-            while (1):
-                guess = input(
-                    "## Input Your Own Guess? (<{}-letter word>/empty):\n".format(self.wordle.k))
-                if guess in self.wordle.words and guess not in history:
-                    return guess, self.compute_score(guess)
-                elif not guess:
-                    break
-                print("(invalid guess: not in the Wordle list)")
-        guess = random.choice(set(guess_words) - history)
+        guess = random.choice([w for w in guess_words if w not in history])
         return guess, self.compute_score(guess)
 
+    def input_guess(self, history, hints=None):
+        """
+            Ask the user for an own guess word (when playing verbosely, see manual_guess)
+
+            Parameters:
+                hints: (list of (guess, response))
+                    the previous hints the guess must be consistent with in hard mode
+
+            Return:
+                the word of guess, or None to use the guess of the player
+        """
+        while (1):
+            guess = input(
+                "## Input Your Own Guess? (<{}-letter word>/empty):\n".format(self.wordle.k))
+            if not guess:
+                return None
+            elif guess not in self.wordle.words or guess in history:
+                print("(invalid guess: not in the Wordle list)")
+            elif hints and any(self.wordle.response_to_guess(g, guess) != r for g, r in hints):
+                print("(invalid guess: not consistent with the previous hints in hard mode)")
+            else:
+                return guess
+
+    def pick_guess(self, candidates, history, fixed_guess=None, verbose=False, legal=None):
+        """
+            Provide a guess (see give_guess) for the current candidates,
+                picked among either the candidates or the guess list (see should_pick_from)
+                (memoized by the game state if the guess cache is enabled)
+
+            Parameters:
+                legal: (array of bool)
+                    the mask of the legal words of the guess list in hard mode (see GameState),
+                    default None (not in hard mode)
+
+            Return:
+                the word of guess and its score
+        """
+        profiler = self.profiler
+        start = time.perf_counter() if profiler is not None else None
+        if self.guess_cache is not None:
+            key = self.guess_cache.fingerprint(candidates, history, fixed_guess, hard_mode=legal is not None)
+            cached = self.guess_cache.get(key)
+            if cached is not None:
+                if start is not None:
+                    profiler.record("pick_guess", start, cache_hit=True)
+                return cached
+
+        if self.should_pick_from(candidates):
+            guess_words = self.candidate_words(candidates)
+        elif legal is None:
+            guess_words = self.guess_list
+        else:
+            # the candidates are always legal, even if not in the guess list
+            guess_words = self.constraint_index.legal_words(legal) or self.candidate_words(candidates)
+        give_start = time.perf_counter() if profiler is not None else None
+        self.num_scored = None
+        guess = self.give_guess(
+            guess_words=guess_words,
+            candidates=candidates,
+            history=history,
+            fixed_guess=fixed_guess,
+            verbose=verbose)
+        if give_start is not None:
+            if fixed_guess is not None:
+                scored = 1
+            else:
+                scored = len(guess_words) if self.num_scored is None else self.num_scored
+            profiler.record("give_guess", give_start, scored=scored)
+
+        if self.guess_cache is not None:
+            self.guess_cache.put(key, guess)
+        if start is not None:
+            profiler.record("pick_guess", start, cache_hit=False if self.guess_cache is not None else None)
+        return guess
+
     def get_response(self, guess, target):
         """
             Return:
@@ -81,28 +206,39 @@ class BaseWordlePlayer():
         """
         return self.wordle.response_to_guess(guess, target)
 
+    def get_response_codes(self, guess, candidates):
+        """
+            Return:
+                an array of response codes for a guess with respect to each candidate
+
+            Runtime: O(nk^2) vectorized
+        """
+        return self.wordle.response_codes(guess, candidates)
+
     def adjust_candidates(self, guess, response, candidates):
         """
             Get updated candidates that satisfy the target conditions
-                based on the response from a guess
+                based on the response from a guess,
+                by comparing the response codes of all candidates at once
 
             Return:
-                a list of new candidates of words
+                an array of indices of the new candidates
 
-            Runtime: O(nk), depends on a shrinking n
+            Runtime: O(nk^2) vectorized, depends on a shrinking n
         """
-        new_candidates = []
-        for candidate in candidates:
-            attempt = self.get_response(guess, candidate)
-            if attempt == response:
-                new_candidates.append(candidate)
+        codes = self.get_response_codes(guess, candidates)
+        return candidates[codes == self.wordle.encode_response(response)]
 
-        return new_candidates
+    def candidate_words(self, candidates):
+        """
+            Return:
+                the list of candidate words given their indices
+        """
+        return [self.wordle.words[i] for i in candidates]
 
-    @staticmethod
-    def should_pick_from(words):
+    def should_pick_from(self, candidates):
         """
-            Determine whether one should pick a word as a guess from the input words
+            Determine whether one should pick a word as a guess from the candidates
             Return a boolean
         """
         return True
@@ -113,7 +249,7 @@ class BaseWordlePlayer():
             word = word.lower()
         return word
 
-    def play(self, target=None, first_guess=None, verbose=False):
+    def play(self, target=None, first_guess=None, verbose=False, hard_mode=False):
         """
             Solve a Wordle game by:
 
@@ -124,44 +260,42 @@ class BaseWordlePlayer():
             Step 3. if not correct yet,
                 adjust the candidate words with respect to the response
                 and repeat the above
+
+            The game itself is a GameState, this method only drives it with the responses
+                (and prints and asks for input when verbose)
+
             Parameters:
                 first_guess: (str)
                     if supplied, uses it as the first guess
                 verbose: (boolean)
                     set to True to print the intermediate guess words step-by-step
+                hard_mode: (boolean)
+                    set to True to only guess words consistent with all previous hints
 
             Return:
                 the number of total guesses (int)
                 the list of (guess, response) at each step (list)
 
             Runtime:
-                O(m+n) + num_guess * O(give_guess + get_response + adjust_candidates)
+                O(n) + num_guess * O(give_guess + get_response + adjust_candidates)
 
         """
-        self.reset()
         if verbose:
             print("\nTARGET: ", "UNKNOWN" if target is None else target)
 
-        target, first_guess = self.lowercase(target), self.lowercase(first_guess)
-        guess_words = [x.lower() for x in self.guess_list]
-        candidates = [x.lower() for x in self.wordle.words]
-        attempts = set()
-        trace = []
-
-        num_guess = 0
-        while (len(candidates) >= 1):
-            num_guess += 1
+        target = self.lowercase(target)
+        game = GameState(self, first_guess, hard_mode)
 
+        while not game.done:
             # Step 1: Guess
-            guess, score = self.give_guess(
-                guess_words=candidates if self.should_pick_from(candidates) else guess_words,
-                candidates=candidates,
-                history=attempts,
-                fixed_guess=first_guess if num_guess == 1 else None,
-                verbose=verbose)
+            guess, score = game.next_guess()
+            if verbose and self.manual_guess:
+                own_guess = self.input_guess(game.history, game.trace if hard_mode else None)
+                if own_guess is not None:
+                    guess, score = own_guess, self.compute_score(own_guess)
             if verbose:
                 print("# Guesses: {}, Picked Guess: {} (Score: {:.2f}), # Available Candidates: {}".format(
-                    num_guess, guess, score, len(candidates)))
+                    game.num_guess + 1, guess, score, len(game.candidates)))
 
             # Step 2: Get a response
             if target is None:
@@ -170,26 +304,24 @@ class BaseWordlePlayer():
                     response = input("Type the response...\n")
                     print("")
             else:
+                start = time.perf_counter() if self.profiler is not None else None
                 response = self.get_response(guess, target)
+                if start is not None:
+                    self.profiler.record("get_response", start)
                 if verbose:
                     print("# Responses: {}".format(response))
 
             # Step 3: Check correctness and adjust
-            trace.append((guess, response))
-            if not self.wordle.is_correct_response(response):
-                if verbose and target:
-                    input("(... click Enter to proceed ...)\n")
-                candidates = self.adjust_candidates(guess, response, candidates)
-                attempts.add(guess)
-            else:
-                break
+            if verbose and target and not self.wordle.is_correct_response(response):
+                input("(... click Enter to proceed ...)\n")
+            game.observe(response, guess)
 
-        if len(candidates) == 0:
+        if game.failed:
             print("Failed to guess: no more available candidates!")
             return
         if verbose:
-            print("Congrats! Total Guesses: {}".format(num_guess))
-        return num_guess, trace
+            print("Congrats! Total Guesses: {}".format(game.num_guess))
+        return game.num_guess, game.trace
 
     def print_initial_top_guesses(self, output_dir="output", output_name="top_scores"):
         """
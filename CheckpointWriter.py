@@ -0,0 +1,110 @@
+import os
+import gzip
+import json
+
+
+class CheckpointWriter():
+    """
+        A buffered writer that streams result lines to an output file,
+            and records a checkpoint of the finished keys (e.g. (first guess, target) pairs)
+
+            lines are appended in batches,
+            and each batch is followed by a checkpoint line (in "<output_path>.checkpoint")
+            storing the size of the output file and the finished keys (with optional values),
+
+            so that a restarted run truncates any lines written after the last checkpoint,
+            and can skip the keys that are already finished (see results)
+
+        With compress=True the output is gzip-compressed (each batch as a gzip member)
+    """
+
+    def __init__(self, output_path, batch_size=256, compress=False):
+        """
+            Initialize
+                output_path: (str)
+                    the output file (".gz" is appended if compressed)
+                batch_size: (int)
+                    the number of keys to buffer before writing
+                compress: (boolean)
+                    set to True to write a gzip-compressed output
+        """
+        self.output_path = output_path + ".gz" if compress and not output_path.endswith(".gz") else output_path
+        self.checkpoint_path = self.output_path + ".checkpoint"
+        self.batch_size = batch_size
+        self.compress = compress
+        self.results = {}
+        self._lines, self._keys = [], {}
+
+        if not os.path.exists(self.output_path):
+            open(self.output_path, "w").close()
+            print("{} created.".format(self.output_path))
+        offset = self._read_checkpoint()
+        if offset is None:
+            # no checkpoint yet: keep any existing content
+            offset = os.path.getsize(self.output_path)
+            self._append_checkpoint(offset, {})
+        elif os.path.getsize(self.output_path) > offset:
+            with open(self.output_path, "rb+") as f:
+                f.truncate(offset)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _read_checkpoint(self):
+        """
+            Load the finished keys from the checkpoint
+
+            Return:
+                the size of the output file at the last checkpoint, or None if there is no checkpoint
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        offset = None
+        with open(self.checkpoint_path) as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    # an interrupted write
+                    break
+                record = json.loads(line)
+                offset = record["offset"]
+                self.results.update(record["results"])
+        return offset
+
+    def _append_checkpoint(self, offset, results):
+        with open(self.checkpoint_path, "a") as f:
+            f.write(json.dumps({"offset": offset, "results": results}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def write(self, key, value=None, line=None):
+        """
+            Mark a key as finished (with an optional value for results),
+                and append an optional line to the output
+        """
+        self._keys[key] = value
+        if line is not None:
+            self._lines.append(line)
+        if len(self._keys) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+            Write the buffered lines and then checkpoint their keys
+        """
+        if not self._keys and not self._lines:
+            return
+        if self._lines:
+            data = "".join(line + "\n" for line in self._lines).encode("utf-8")
+            with open(self.output_path, "ab") as f:
+                f.write(gzip.compress(data) if self.compress else data)
+                f.flush()
+                os.fsync(f.fileno())
+        self._append_checkpoint(os.path.getsize(self.output_path), self._keys)
+        self.results.update(self._keys)
+        self._lines, self._keys = [], {}
+
+    def close(self):
+        self.flush()
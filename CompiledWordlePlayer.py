@@ -0,0 +1,81 @@
+from BaseWordlePlayer import BaseWordlePlayer
+import numpy as np
+
+
+class CompiledWordlePlayer(BaseWordlePlayer):
+    """
+        Playing Wordle by replaying a compiled policy (see WordlePolicy)
+
+        The guesses are looked up from the decision tree of another player,
+            so no scores are computed for the game states visited before.
+            The first guess and hard mode are fixed by the policy.
+
+        Runtime:
+            num_guess * O(give_guess + get_response + adjust_candidates)
+            = num_guess * O(1) for visited game states
+    """
+    manual_guess = False
+
+    def __init__(self, policy):
+        """
+            Initialize
+                policy: a WordlePolicy object
+        """
+        super().__init__(policy.wordle, policy.player.guess_list)
+        self.policy = policy
+
+    def reset(self):
+        """
+            Reset to the root of the policy
+        """
+        self.node = self.policy.root
+
+    def snapshot(self):
+        return self.node
+
+    def restore(self, snapshot):
+        self.node = snapshot
+
+    def compute_score(self, word):
+        """
+            The score of the word given by the compiled player at the current state
+        """
+        return self.node.score if self.node is not None and word == self.node.guess else -1
+
+    def give_guess(self, guess_words, candidates, history, fixed_guess=None, verbose=False):
+        """
+            Provide the guess of the current state
+                (a fixed guess other than the first guess of the policy is not supported)
+
+            Runtime: O(1)
+        """
+        if fixed_guess is not None and fixed_guess != self.node.guess:
+            raise ValueError("the policy is compiled with the first guess '{}'".format(self.node.guess))
+        return self.node.guess, self.node.score
+
+    def pick_guess(self, candidates, history, fixed_guess=None, verbose=False, legal=None):
+        """
+            Provide the guess of the current state (see give_guess),
+                only in hard mode if the policy is compiled in hard mode
+        """
+        if (legal is not None) != self.policy.hard_mode:
+            raise ValueError("the policy is compiled {} hard mode".format(
+                "in" if self.policy.hard_mode else "without"))
+        return super().pick_guess(candidates, history, fixed_guess, verbose, legal)
+
+    def get_response(self, guess, target):
+        return self.policy.player.get_response(guess, target)
+
+    def adjust_candidates(self, guess, response, candidates):
+        """
+            Move to the next state of the policy
+
+            Runtime: O(1) for visited game states
+        """
+        self.node = self.policy.child(self.node, response)
+        if self.node is None:
+            return np.array([], dtype=np.intp)
+        return self.node.candidates
+
+    def should_pick_from(self, candidates):
+        return False
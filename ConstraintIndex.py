@@ -0,0 +1,112 @@
+import numpy as np
+
+
+class ConstraintIndex():
+    """
+        An index of the letters of a list of words (e.g. the guess list of a player) for hard mode,
+            where every guess must be consistent with all previous hints,
+            i.e. it gets the same responses as the target to the previous guesses
+
+        A hint (guess, response) constrains the words by
+            the letter at each position: the guess letter if "2", any other letter otherwise
+            the count of each guessed letter: at least its number of "1"s and "2"s,
+                exactly that number if one of its appearances is "0"
+
+        The legal words of a game are kept as a boolean mask over the words,
+            narrowed at each turn by intersecting it with the masks of the new hint,
+            which are looked up from the memoized mask of each (position, letter)
+            and the memoized count of each letter in every word
+
+        Runtime: O(mk) for each new (position, letter) and letter, O(mk) per hint
+    """
+
+    def __init__(self, wordle, words):
+        """
+            Initialize
+                wordle: an Wordle object
+                words: (list of str)
+                    the k-letter words to index
+        """
+        self.wordle = wordle
+        self.words = words
+        self.word_idx = {word: idx for idx, word in enumerate(words)}
+        self.letters = np.array([[ord(c) for c in w] for w in words], dtype=np.int32).reshape(len(words), wordle.k)
+        self._positions = {}
+        self._counts = {}
+
+    def all(self):
+        """
+            Return:
+                the mask of all words (the legal words before any hint)
+        """
+        return np.ones(len(self.words), dtype=bool)
+
+    def position_mask(self, position, letter):
+        """
+            Return:
+                the mask of the words with the letter at the position (memoized)
+        """
+        mask = self._positions.get((position, letter))
+        if mask is None:
+            mask = self._positions[(position, letter)] = self.letters[:, position] == ord(letter)
+        return mask
+
+    def letter_count(self, letter):
+        """
+            Return:
+                the number of appearances of the letter in each word (memoized)
+        """
+        counts = self._counts.get(letter)
+        if counts is None:
+            counts = self._counts[letter] = (self.letters == ord(letter)).sum(axis=1).astype(np.uint8)
+        return counts
+
+    def constrain(self, legal, guess, response):
+        """
+            Narrow the legal words by a hint
+
+                a response that no word can get
+                (a "1" after a "0" of the same letter) leaves no legal word
+
+            Return:
+                a new mask of the legal words
+
+            Runtime: O(mk)
+        """
+        wrong, exact = self.wordle.rformat[0], self.wordle.rformat[2]
+        legal = legal.copy()
+        found, absent = {}, set()
+        for position, (g, r) in enumerate(zip(guess, response)):
+            if r == exact:
+                legal &= self.position_mask(position, g)
+            else:
+                legal &= ~self.position_mask(position, g)
+                if r == wrong:
+                    absent.add(g)
+                elif g in absent:
+                    return np.zeros_like(legal)
+            if r != wrong:
+                found[g] = found.get(g, 0) + 1
+
+        for g in set(guess):
+            counts = self.letter_count(g)
+            if g in absent:
+                legal &= counts == found.get(g, 0)
+            else:
+                legal &= counts >= found[g]
+        return legal
+
+    def is_legal(self, legal, word):
+        """
+            Return:
+                whether the word is in the list and legal
+        """
+        idx = self.word_idx.get(word)
+        return idx is not None and bool(legal[idx])
+
+    def legal_words(self, legal):
+        """
+            Return:
+                the list of the legal words
+        """
+        return [self.words[i] for i in np.flatnonzero(legal)]
@@ -0,0 +1,108 @@
+import time
+import numpy as np
+
+
+class GameState():
+    """
+        A step-wise Wordle game of a player, which never blocks on input nor prints:
+            next_guess() gives the guess for the current candidates,
+            observe(response) submits the response to it and adjusts the candidates
+
+        In hard mode, the legal guess words are narrowed by each hint (see ConstraintIndex)
+
+        Several games can be played by the same player at once,
+            since the player is restored to the state of a game (see BaseWordlePlayer.snapshot)
+            before computing anything for it
+
+        Example:
+            game = GameState(player, first_guess="raise")
+            while not game.done:
+                guess, score = game.next_guess()
+                game.observe(player.get_response(guess, target))
+    """
+
+    def __init__(self, player, first_guess=None, hard_mode=False):
+        """
+            Initialize
+                player: a player object (see BaseWordlePlayer)
+                first_guess: (str)
+                    if supplied, uses it as the first guess
+                hard_mode: (boolean)
+                    set to True to only guess words consistent with all previous hints
+        """
+        self.player = player
+        self.wordle = player.wordle
+        self.first_guess = player.lowercase(first_guess)
+        self.candidates = np.arange(len(self.wordle.words))
+        self.history = set()
+        self.trace = []
+        self.solved = False
+        self.guess, self.score = None, None
+        self.legal = player.constraint_index.all() if hard_mode else None
+
+        player.reset()
+        self.snapshot = player.snapshot()
+
+    @property
+    def num_guess(self):
+        return len(self.trace)
+
+    @property
+    def failed(self):
+        """
+            Whether no candidate is left (i.e. the responses are inconsistent)
+        """
+        return not self.solved and len(self.candidates) == 0
+
+    @property
+    def done(self):
+        return self.solved or len(self.candidates) == 0
+
+    def next_guess(self):
+        """
+            Provide the guess of the current state (picked once per turn, see BaseWordlePlayer.pick_guess)
+
+            Return:
+                the word of guess and its score, or (None, None) if the game is done
+        """
+        if self.guess is None and not self.done:
+            if self.player.profiler is not None:
+                self.player.profiler.begin_turn(len(self.trace) + 1, len(self.candidates))
+            self.player.restore(self.snapshot)
+            self.guess, self.score = self.player.pick_guess(
+                self.candidates, self.history,
+                fixed_guess=self.first_guess if not self.trace else None, verbose=False, legal=self.legal)
+        return self.guess, self.score
+
+    def observe(self, response, guess=None):
+        """
+            Submit the response to a guess (the guess of the current state if not given)
+                and adjust the candidates if not correct yet
+
+            Return:
+                True if the response is correct
+        """
+        if self.done:
+            raise ValueError("the game is already over")
+        if not self.wordle.validate_response(response):
+            raise ValueError("invalid response '{}'".format(response))
+        guess = self.player.lowercase(guess) or self.next_guess()[0]
+
+        self.trace.append((guess, response))
+        self.guess, self.score = None, None
+        profiler = self.player.profiler
+        if self.wordle.is_correct_response(response):
+            self.solved = True
+        else:
+            start = time.perf_counter() if profiler is not None else None
+            self.player.restore(self.snapshot)
+            self.candidates = self.player.adjust_candidates(guess, response, self.candidates)
+            self.snapshot = self.player.snapshot()
+            self.history.add(guess)
+            if self.legal is not None:
+                self.legal = self.player.constraint_index.constrain(self.legal, guess, response)
+            if start is not None:
+                profiler.record("adjust_candidates", start)
+        if profiler is not None:
+            profiler.end_turn()
+        return self.solved
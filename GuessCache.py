@@ -0,0 +1,79 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+
+class GuessCache():
+    """
+        A bounded memo of the guesses picked by a deterministic player,
+            keyed by a fingerprint of the game state:
+            the sorted candidate indices, the previous guesses, the fixed guess
+            and whether the game is in hard mode
+
+        The least recently used entries are evicted beyond <max_size>,
+            and the numbers of hits and misses are counted
+    """
+
+    def __init__(self, max_size=2 ** 14):
+        """
+            Initialize
+                max_size: (int)
+                    the maximum number of entries
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def fingerprint(candidates, history, fixed_guess=None, hard_mode=False):
+        """
+            Return the key of a game state
+                (the legal guesses of hard mode are determined by the candidates and the previous guesses)
+
+            Runtime: O(n + len(history))
+        """
+        digest = hashlib.blake2b(
+            np.ascontiguousarray(candidates, dtype=np.int64).tobytes(), digest_size=16).digest()
+        return digest, len(candidates), frozenset(history), fixed_guess, hard_mode
+
+    def get(self, key):
+        """
+            Return:
+                the cached (guess, score) of the key, or None if missing
+        """
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+            Cache the (guess, score) of the key
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+            Remove all entries and reset the counters
+        """
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        """
+            Return:
+                a message of the hit/miss counters
+        """
+        total = self.hits + self.misses
+        return "Guess Cache: {} hits, {} misses ({:.1%} hit rate), {} entries".format(
+            self.hits, self.misses, self.hits / total if total else 0.0, len(self))
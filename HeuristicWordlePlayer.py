@@ -1,4 +1,5 @@
 from BaseWordlePlayer import BaseWordlePlayer
+import numpy as np
 
 
 class HeuristicWordlePlayer(BaseWordlePlayer):
@@ -7,43 +8,73 @@ class HeuristicWordlePlayer(BaseWordlePlayer):
             by picking words that are composed of high-frequency characters
             among the available candidates
 
+        Characters are encoded as 26-bit masks of each word,
+            so the scores of all guess words are computed by a single matrix product
+
         Runtime:
-            O(m+n) + num_guess * O(give_guess + get_response + adjust_candidates)
-            = O(m+n) + num_guess * O(mk + k + nk)
-            = O(k(m+n))
+            O(k(m+n)) + num_guess * O(give_guess + get_response + adjust_candidates)
+            = O(k(m+n)) + num_guess * O(m + k + nk^2)
+            = O(k(m+nk))
 
     """
+    manual_guess = False
 
-    def __init__(self, wordle, guess_list=None):
-        super().__init__(wordle, guess_list)
+    def __init__(self, wordle, guess_list=None, guess_cache_size=2 ** 14):
+        super().__init__(wordle, guess_list, guess_cache_size)
+        self.target_masks = self.letter_masks(self.wordle.words)
+        self.target_presence = self.letter_presence(self.target_masks)
+        self.guess_presence = self.letter_presence(self.letter_masks(self.guess_list))
 
     def reset(self):
         """
             Reset Character Frequencies
         """
-        self.char_freq = self.update_char_freq(self.wordle.words)
+        self.char_freq = self.update_char_freq(np.arange(len(self.wordle.words)))
+
+    def snapshot(self):
+        return self.char_freq
+
+    def restore(self, snapshot):
+        self.char_freq = snapshot
 
     @staticmethod
-    def update_char_freq(words):
+    def letter_masks(words):
         """
-            Get character frequencies among existing words
+            Encode the set of characters of each word as a 26-bit mask
+
+            Return:
+                an array of masks, with bit i set if chr(ord("a") + i) is in the word
+
+            Runtime: O(k) per word
+        """
+        letters = np.array([[ord(c) - ord("a") for c in w] for w in words], dtype=np.int64)
+        letters = letters.reshape(len(words), -1)
+        if letters.size and (letters.min() < 0 or letters.max() >= 26):
+            raise ValueError("words must only contain the characters a-z")
+        return np.bitwise_or.reduce(np.left_shift(1, letters), axis=1)
+
+    @staticmethod
+    def letter_presence(masks):
+        """
+            Expand letter masks to a (len(masks), 26) matrix of 0/1 character presence
+        """
+        return (np.asarray(masks)[:, None] >> np.arange(26)) & 1
+
+    def update_char_freq(self, candidates):
+        """
+            Get character frequencies among the candidate words,
+                as the column sums of their character presence
                 Trick 1:
                     only count unique characters for each word
                 Trick 2:
                     ignore characters that already exist for all words
 
             Return:
-                {c: frequencies} for c in each word in words
+                an array of frequencies for each character from "a" to "z"
 
-            Runtime: O(k)
+            Runtime: O(n)
         """
-        char_freq = {chr(c): 0 for c in range(ord("a"), ord("z")+1)}
-        for w in words:
-            for c in set(w):
-                char_freq[c] += 1
-        for c in char_freq:
-            char_freq[c] %= len(words)
-        return char_freq
+        return self.target_presence[candidates].sum(axis=0) % len(candidates)
 
     def compute_score(self, word):
         """
@@ -59,31 +90,38 @@ class HeuristicWordlePlayer(BaseWordlePlayer):
 
             Runtime: O(k)
         """
-        return sum([self.char_freq[c] for c in set(word)])
+        return int(self.letter_presence(self.letter_masks([word]))[0] @ self.char_freq)
 
     def give_guess(self, guess_words, candidates, history, fixed_guess=None, verbose=False):
         """
             Provide a guess word that has the maximum score
             (unless specified by the fixed guess)
 
-            Runtime: O(mk)
+                the scores of all guess words are computed at once
+                as a product of their character presence and the character frequencies,
+                and the last word with the maximum score is picked among ties
+
+            Runtime: O(m)
         """
         if fixed_guess is not None:
             return fixed_guess, self.compute_score(fixed_guess)
 
-        guess, max_score = None, 0.0
-        for ind, word in enumerate(guess_words):
-            if word not in history:
-                score = self.compute_score(word)
-                if score >= max_score:
-                    guess, max_score = word, score
-        return guess, max_score
+        if guess_words is self.guess_list:
+            presence = self.guess_presence
+        else:
+            presence = self.letter_presence(self.letter_masks(guess_words))
+        scores = presence @ self.char_freq
+        allowed = np.flatnonzero([word not in history for word in guess_words])
+        if not len(allowed):
+            return None, 0.0
+        best = allowed[len(allowed) - 1 - int(np.argmax(scores[allowed][::-1]))]
+        return guess_words[best], int(scores[best])
 
     def adjust_candidates(self, guess, response, candidates):
         """
             Update character frequencies with the latest available candidates
 
-            Runtime: O(nk), depends on a shrinking n
+            Runtime: O(nk^2), depends on a shrinking n
         """
         new_candidates = super().adjust_candidates(guess, response, candidates)
         if len(new_candidates) >= 1:
@@ -91,16 +129,12 @@ class HeuristicWordlePlayer(BaseWordlePlayer):
 
         return new_candidates
 
-    @staticmethod
-    def should_pick_from(words):
+    def should_pick_from(self, candidates):
         """
-            Should pick from the words if they have the same character sets
+            Should pick from the candidates if they have the same character sets
             (would be scored indifferently)
 
-            Runtime: O(k)
+            Runtime: O(n)
         """
-        c_set = set(words[0])
-        for w in words[1:]:
-            if set(w) != c_set:
-                return False
-        return True
+        masks = self.target_masks[candidates]
+        return bool((masks == masks[0]).all())
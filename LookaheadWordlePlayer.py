@@ -0,0 +1,151 @@
+from MaxInformationGainWordlePlayer import MaxInformationGainWordlePlayer
+from GuessCache import GuessCache
+import numpy as np
+import time
+
+
+class LookaheadWordlePlayer(MaxInformationGainWordlePlayer):
+    """
+        Playing Wordle by minimizing the expected number of guesses with a two-ply lookahead
+
+        At each guess, the options are the best <num_options> guess words by entropy
+            (see MaxInformationGainWordlePlayer) and the best <num_options> candidates by entropy,
+            and the option with the least expected number of guesses is picked:
+                1 + sum over the responses (other than correct) of p(response) * R(group)
+            where R is the expected number of remaining guesses of a group of candidates:
+                1 for one candidate, 1.5 for two candidates,
+                otherwise the least of leaf(size of the group) and of the second ply
+                over the candidates h in the group:
+                    1 + sum over the responses to h (other than correct) of p(response) * leaf(size)
+            leaf(s) = (2s - 1) / s + leaf_log_weight * log(s / 2) estimates the remaining guesses
+                of s candidates (the first term if one candidate splits all others),
+                with the weight (and the default number of options) tuned for the mean number of guesses
+                over a random half of the small Wordle list, the other half held out for evaluation
+
+        R only depends on the group, so it is memoized across turns and games (see GuessCache),
+            and the responses are looked up from the precomputed responses
+
+        A move falls back to the guess of the maximum entropy (the greedy guess)
+            once the lookahead would score more than <node_budget> (guess, candidate) pairs
+            (counted as if nothing were memoized, so that the guesses stay deterministic)
+            or take more than <time_budget> seconds (which makes the guesses depend on the machine)
+
+        Runtime:
+            give_guess: O(m(n + 3^k)) + O(num_options * n^2 log(n)) with a shrinking n,
+            bounded by the budget
+    """
+    # the weight of the log term of the leaf estimate
+    leaf_log_weight = 0.8
+
+    def __init__(self, wordle, guess_list=None, precompute="small", cache=None, guess_cache_size=2 ** 14,
+                 precompute_processes=1, num_options=5, node_budget=2 ** 22, time_budget=None,
+                 group_cache_size=2 ** 18):
+        """
+            Initialize
+                num_options: (int)
+                    the number of the best guess words (and of the best candidates) to look ahead
+                node_budget: (int)
+                    the maximum number of (guess, candidate) pairs scored per move
+                time_budget: (float)
+                    the maximum seconds per move, default None (unbounded)
+                group_cache_size: (int)
+                    the maximum number of groups of candidates to memoize R for
+                (see MaxInformationGainWordlePlayer for the others)
+        """
+        super().__init__(wordle, guess_list, precompute, cache, guess_cache_size, precompute_processes)
+        self.num_options = num_options
+        self.node_budget = node_budget
+        self.time_budget = time_budget
+        self.group_cache = GuessCache(group_cache_size)
+        self.target_rows = np.array(
+            [self.WORD_IDX["guess"].get(word, -1) for word in self.wordle.words], dtype=np.intp)
+
+        sizes = np.arange(len(self.wordle.words) + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.leaf = np.where(
+                sizes >= 2, (2 * sizes - 1) / sizes + self.leaf_log_weight * np.log(sizes / 2), sizes)
+
+    def expected_guesses(self, group):
+        """
+            The expected number of remaining guesses R of a group of candidates (memoized)
+
+            Runtime: O(s^2 log(s)) for a group of s candidates, O(s) if memoized
+        """
+        size = len(group)
+        if size <= 2:
+            return self.leaf[size]
+        key = self.group_cache.fingerprint(group, ())
+        value = self.group_cache.get(key)
+        if value is None:
+            value = self.leaf[size]
+            rows = self.target_rows[group]
+            rows = rows[rows >= 0]
+            if len(rows):
+                # p(response) * leaf(size) summed as count * leaf(count) / s,
+                # where each candidate h solves itself (count 1, leaf 1), which is removed from the sum
+                counts = self.get_sparse_distribution(group, rows)
+                totals = (counts * self.leaf[counts]).sum(axis=1)
+                value = min(value, 1 + (totals.min() - 1) / size)
+            self.group_cache.put(key, value)
+        return value
+
+    def partition(self, row, candidates):
+        """
+            Return:
+                the groups of candidates by their response to a guess word (given by its index),
+                except the correct response
+
+            Runtime: O(n log(n))
+        """
+        codes = self.RESPONSES[row, candidates]
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+        splits = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        solved = self.wordle.encode_response(self.wordle.rformat[2] * self.wordle.k)
+        return [candidates[order[start: stop]]
+                for start, stop in zip(np.append(0, splits), np.append(splits, len(codes)))
+                if codes[start] != solved]
+
+    def give_guess(self, guess_words, candidates, history, fixed_guess=None, verbose=False):
+        """
+            Pick the option with the least expected number of guesses
+            (unless specified by the fixed guess)
+
+                the options are ordered by decreasing entropy (the last word first among ties),
+                and the first option wins among ties,
+                so the greedy guess is the first option (see MaxInformationGainWordlePlayer.give_guess)
+
+            Return:
+                the word of guess and its score (entropy)
+
+            Runtime: see LookaheadWordlePlayer
+        """
+        if fixed_guess is not None:
+            return fixed_guess, self.compute_score(fixed_guess)
+
+        rows = self.guess_rows(guess_words, history)
+        if not len(rows):
+            return None, 0.0
+        if self.distribution is None and len(rows) < len(self.guess_list):
+            scores = self.get_scores(self.get_distribution(candidates, rows))
+        else:
+            scores = self.get_scores(self.current_distribution()[rows])
+        order = np.lexsort((-np.arange(len(rows)), -scores))
+        is_candidate = np.isin(rows[order], self.target_rows[candidates])
+        options = np.concatenate([order[:self.num_options], order[is_candidate][:self.num_options]])
+        options = options[np.sort(np.unique(options, return_index=True)[1])]
+
+        start = time.perf_counter()
+        best, best_value, nodes = options[0], None, 0
+        for option in options if len(candidates) > 1 else []:
+            groups = self.partition(rows[option], candidates)
+            # the pairs scored by the second ply of every group (see expected_guesses)
+            nodes += len(candidates) + sum(len(group) ** 2 for group in groups if len(group) > 2)
+            if nodes > self.node_budget or (
+                    self.time_budget is not None and time.perf_counter() - start > self.time_budget):
+                best = options[0]
+                break
+            value = 1 + sum(len(group) * self.expected_guesses(group) for group in groups) / len(candidates)
+            if best_value is None or value < best_value:
+                best, best_value = option, value
+        return self.guess_list[rows[best]], float(scores[best])
@@ -1,8 +1,18 @@
 from BaseWordlePlayer import BaseWordlePlayer
-from utility import _get_output_path
+from PrecomputeCache import PrecomputeCache
+from utility import _get_output_path, _hash_words
+from functools import partial
+from collections import deque
 import numpy as np
+import time
 import os
-from tqdm import tqdm
+
+
+def _response_rows(wordle, guess_list, start, stop):
+    """
+        The rows [start, stop) of the precomputed responses (picklable for worker processes)
+    """
+    return wordle.response_matrix(guess_list[start: stop], wordle.words)
 
 
 class MaxInformationGainWordlePlayer(BaseWordlePlayer):
@@ -17,21 +27,113 @@ class MaxInformationGainWordlePlayer(BaseWordlePlayer):
             Precompute: O(mnk)
             Play:
                 O(m+n) + num_guess * O(give_guess + get_response + adjust_candidates)
-            ~= O(m+n) + num_guess * O(m*3^k + mnk)
-            ~= O(m(3^k + nk))
+            ~= O(m+n) + num_guess * O(m*3^k + mn)
+            ~= O(m(3^k + n))
+
+        For long words the response distributions only keep the responses that occur,
+            so that the memory and runtime do not grow with 3^k
     """
+    manual_guess = False
+    # the maximum number of responses (3^k) to keep the counts of all responses in a distribution
+    max_dense_responses = 3 ** 5
+    # the number of recently picked guesses to try first when searching for a guess (see search_guess)
+    num_recent_guesses = 16
 
-    def __init__(self, wordle, guess_list=None, precompute="small"):
-        super().__init__(wordle, guess_list)
-        self.WORD_IDX = self.precompute_word_idx()
-        self.RESPONSES = self.precompute_response_to_guess(suffix=precompute)
+    def __init__(self, wordle, guess_list=None, precompute="small", cache=None, guess_cache_size=2 ** 14,
+                 precompute_processes=1):
+        """
+            Initialize
+                precompute: (str)
+                    the name of the solver setting, used in output file names
+                cache: (PrecomputeCache)
+                    where to cache the precomputed responses,
+                    default a PrecomputeCache in "output/precompute"
+                guess_cache_size: (int)
+                    see BaseWordlePlayer
+                precompute_processes: (int)
+                    the number of worker processes to compute the responses (None to use all CPUs)
+        """
+        super().__init__(wordle, guess_list, guess_cache_size)
         self.precompute = precompute
+        self.precompute_processes = precompute_processes
+        self.cache = cache if cache is not None else PrecomputeCache(os.path.join("output", "precompute"))
+        self.WORD_IDX = self.precompute_word_idx()
+        self.CACHE_META = self.precompute_cache_meta()
+        self._responses = None
+        self._init_distribution = None
+        self._max_responses = None
+        self.recent_guesses = deque(maxlen=self.num_recent_guesses)
+
+    def __getstate__(self):
+        """
+            Pickle without the precomputed arrays
+                (e.g. when sent to worker processes),
+                they are memory-mapped again from the cache on first use
+        """
+        state = super().__getstate__()
+        state["_responses"] = state["_init_distribution"] = state["_max_responses"] = None
+        state.pop("distribution", None)
+        return state
+
+    @property
+    def RESPONSES(self):
+        """
+            The precomputed responses (see precompute_response_to_guess),
+                loaded from the cache (or computed) on first use
+        """
+        if self._responses is None:
+            self._responses = self.precompute_response_to_guess(suffix=self.precompute)
+        return self._responses
+
+    @property
+    def init_distribution(self):
+        """
+            The initial response distribution (see precompute_init_distribution),
+                loaded from the cache (or computed) on first use and kept for every game
+        """
+        if self._init_distribution is None:
+            self._init_distribution = self.precompute_init_distribution()
+        return self._init_distribution
+
+    @property
+    def max_responses(self):
+        """
+            The number of distinct responses of each guess word to all target words,
+                which bounds the number of distinct responses to any candidates
+        """
+        if self._max_responses is None:
+            self._max_responses = np.count_nonzero(self.init_distribution, axis=1)
+        return self._max_responses
 
     def reset(self):
         """
             Reset Response Distributions
         """
-        self.distribution = self.precompute_init_distribution(suffix=self.precompute)
+        self.candidates = np.arange(len(self.wordle.words))
+        self.distribution = self.init_distribution
+
+    def snapshot(self):
+        return self.candidates, self.distribution
+
+    def restore(self, snapshot):
+        """
+            Restore the candidates (and their distribution if computed),
+                kept as is if they are already the current candidates
+        """
+        if snapshot[0] is not self.candidates:
+            self.candidates, self.distribution = snapshot
+
+    def current_distribution(self):
+        """
+            Return the response distribution of the current candidates,
+                computed on first use after the candidates are adjusted
+                (so that it is skipped when the guess is memoized)
+
+            Runtime: O(m(n + 3^k)) for first use, O(1) afterwards
+        """
+        if self.distribution is None:
+            self.distribution = self.get_distribution(self.candidates)
+        return self.distribution
 
     def precompute_word_idx(self):
         """
@@ -43,87 +145,255 @@ class MaxInformationGainWordlePlayer(BaseWordlePlayer):
             "target": {x: i for i, x in enumerate(self.wordle.words)}
         }
 
+    def precompute_cache_meta(self):
+        """
+            Return the header fields that a cached precompute must match:
+                the word length, the response format and the content of both word lists
+
+            Runtime: O(k(m+n))
+        """
+        return {
+            "k": self.wordle.k,
+            "rformat": list(self.wordle.rformat),
+            "guess_hash": _hash_words(self.guess_list),
+            "target_hash": _hash_words(self.wordle.words)
+        }
+
     def precompute_response_to_guess(self, output_dir="output", suffix="small", verbose=True):
         """
             Precompute and cache possible responses for each guess to each target
                 (since they will be frequently accessed during score computation)
+
+                Each response is stored as its response code (see Wordle.encode_response)
+                in a dense (m, n) matrix of the smallest unsigned integer type that fits,
+                and cached by the content of the word lists (see PrecomputeCache)
+
+                The matrix is computed in chunks of guess words across <precompute_processes>
+                worker processes, and an interrupted computation resumes from the finished chunks
+                (see PrecomputeCache.get_or_compute_chunked)
+
+                A cache from an older version in text format
+                (<output_dir>/precompute_responses_<suffix>.txt) is migrated if it is still valid
+
             Return:
-                {idx(guess): idx(target): response} for each guess and each target
+                a numpy array with [idx(guess), idx(target)] = code(response)
 
-            Runtime: O(mnk) for first compute
+            Runtime: O(mnk^2) vectorized for first compute, O(1) to load
         """
-
-        output_path = _get_output_path(output_dir, "precompute_responses", suffix) + ".txt"
-        responses = {i: {} for i in range(len(self.guess_list))}
-        if os.path.exists(output_path):
-            with open(output_path) as f:
-                for line in f.readlines():
-                    guess_idx, target_idx, response_code = line.strip().split("\t")
-                    responses[int(guess_idx)][int(target_idx)] = response_code
-        else:
+        def migrate():
+            legacy_path = _get_output_path(output_dir, "precompute_responses", suffix) + ".txt"
+            if os.path.exists(legacy_path):
+                if verbose:
+                    print("Migrating {} to the binary format...".format(legacy_path))
+                responses = self._load_text_responses(legacy_path)
+                if responses is not None:
+                    return responses
+                print("{} is outdated, ignored.".format(legacy_path))
             if verbose:
                 print("Pre-computing all responses between words...")
-                li = tqdm(self.guess_list)
-            else:
-                li = self.guess_list
-            with open(output_path, "w") as f:
-                for i, guess in enumerate(li):
-                    for j, target in enumerate(self.wordle.words):
-                        responses[i][j] = self.wordle.response_to_guess(guess, target)
-                        f.write("\t".join([str(i), str(j), responses[i][j]]) + "\n")
-                print("{} saved.".format(f.name))
-        return responses
-
-    def precompute_init_distribution(self, output_dir="output", suffix="small", verbose=True):
+            return None
+
+        return self.cache.get_or_compute_chunked(
+            "precompute_responses", self.CACHE_META,
+            shape=(len(self.guess_list), len(self.wordle.words)), dtype=self.wordle.code_dtype,
+            compute_rows=partial(_response_rows, self.wordle, self.guess_list),
+            processes=self.precompute_processes, initial=migrate, verbose=verbose)
+
+    def _load_text_responses(self, path, num_checks=10):
+        """
+            Load responses cached in the text format,
+                each line stores "idx(guess)\tidx(target)\tresponse"
+
+            Return:
+                a numpy array with [idx(guess), idx(target)] = code(response),
+                or None if the file does not cover all pairs
+                or does not match the current word lists (and word length) on <num_checks> sampled guesses
+
+            Runtime: O(mnk)
+        """
+        responses = np.zeros((len(self.guess_list), len(self.wordle.words)), dtype=self.wordle.code_dtype)
+        num_lines = 0
+        with open(path) as f:
+            for line in f:
+                guess_idx, target_idx, response = line.strip().split("\t")
+                if int(guess_idx) >= responses.shape[0] or int(target_idx) >= responses.shape[1]:
+                    return None
+                if not self.wordle.validate_response(response):
+                    return None
+                responses[int(guess_idx), int(target_idx)] = self.wordle.encode_response(response)
+                num_lines += 1
+        if num_lines != responses.size:
+            return None
+
+        checks = np.linspace(0, len(self.guess_list) - 1, num_checks).astype(int)
+        expected = self.wordle.response_matrix([self.guess_list[i] for i in checks], self.wordle.words)
+        return responses if np.array_equal(responses[checks], expected) else None
+
+    def precompute_init_distribution(self, verbose=True):
         """
             Precompute and cache the initial response distribution
                 for each guess word with respect to all tareget words
+                (cached in the same way as the responses)
 
             Return:
-                {idx(guess): response: count} for each guess and each response
+                a numpy array with [idx(guess), code(response)] = count
 
-            Runtime: O(mnk) for first compute
+            Runtime: O(m(n + 3^k)) for first compute, O(1) to load
         """
-        output_path = _get_output_path(output_dir, "precompute_init_distribution", suffix) + ".txt"
-        if os.path.exists(output_path):
-            distribution = {i: {} for i in self.RESPONSES}
-            with open(output_path) as f:
-                for line in f.readlines():
-                    i, response, count = line.strip().split("\t")
-                    distribution[int(i)][response] = int(count)
-        else:
+        def compute():
             if verbose:
                 print("Pre-computing initial response distribution between words...")
-            distribution = self.get_distribution(self.wordle.words)
-            with open(output_path, "w") as f:
-                for i in self.RESPONSES:
-                    for response in distribution[i]:
-                        f.write("\t".join([str(i), response, str(distribution[i][response])]) + "\n")
-                print("{} saved.".format(f.name))
-        return distribution
+            distribution = self.get_distribution(np.arange(len(self.wordle.words)))
+            return distribution.astype(np.min_scalar_type(len(self.wordle.words)))
 
-    def get_distribution(self, words):
+        return self.cache.get_or_compute("precompute_init_distribution", self.CACHE_META, compute, verbose)
+
+    def _response_codes(self, rows, start, stop, cols):
+        """
+            The response codes of the guess words rows[start: stop] (all guess words if rows is None)
+                to the candidates
+        """
+        if rows is None:
+            return self.RESPONSES[start: stop, cols]
+        return self.RESPONSES[rows[start: stop, None], cols]
+
+    def get_distribution(self, candidates, rows=None):
         """
             For each word, computes all possible response outcomes
-                with respect to different target words
+                with respect to different target words (given as the indices of candidates)
                 and store the frequency of each response (distribution)
 
+                only for the guess words of the given indices (rows) if supplied
+
+                the counts of all guess words are computed together by one bincount
+                over the response codes offset by idx(word) * 3^k,
+                in chunks of guess words to bound the memory
+
+                for long words (3^k > max_dense_responses),
+                only the counts of the responses that occur are kept (see get_sparse_distribution)
+
+                measured as the "get_distribution" phase if a profiler is set (see PlayProfiler)
+
             Return:
-                {idx(word):{response: count}}
-
-            Runtime: O(mnk) with a shrinking n
-        """
-        distribution = {}
-        for i in self.RESPONSES:
-            distribution[i] = {}
-            for w in words:
-                j = self.WORD_IDX["target"][w]
-                response = self.RESPONSES[i][j]
-                if response not in distribution[i]:
-                    distribution[i][response] = 0
-                distribution[i][response] += 1
+                a numpy array with [idx(word), code(response)] = count
+
+            Runtime: O(m(n + 3^k)) with a shrinking n
+        """
+        start = time.perf_counter() if self.profiler is not None else None
+        cols = np.asarray(candidates, dtype=np.intp)
+        if self.wordle.num_responses > self.max_dense_responses:
+            distribution = self.get_sparse_distribution(cols, rows)
+        else:
+            distribution = self._get_dense_distribution(cols, rows)
+        if start is not None:
+            self.profiler.record("get_distribution", start)
         return distribution
 
+    def _get_dense_distribution(self, cols, rows):
+        """
+            The response distribution over all 3^k response codes (see get_distribution)
+        """
+        rows = None if rows is None else np.asarray(rows, dtype=np.intp)
+        num_rows = len(self.guess_list) if rows is None else len(rows)
+        num_responses = self.wordle.num_responses
+        distribution = np.empty((num_rows, num_responses), dtype=np.int64)
+        chunk_size = max(1, self.wordle.max_chunk_elements // max(1, len(cols)))
+        for start in range(0, num_rows, chunk_size):
+            codes = self._response_codes(rows, start, start + chunk_size, cols).astype(np.intp)
+            codes += np.arange(len(codes))[:, None] * num_responses
+            counts = np.bincount(codes.ravel(), minlength=len(codes) * num_responses)
+            distribution[start: start + len(codes)] = counts.reshape(-1, num_responses)
+        return distribution
+
+    def get_sparse_distribution(self, candidates, rows=None):
+        """
+            For each word, the counts of the distinct response codes
+                with respect to the candidates, in no particular order
+                and padded with zeros to the largest number of distinct responses
+                (which is enough for the entropy, see entropy)
+
+                the codes of each guess word are sorted,
+                and the counts are the lengths of the runs of equal codes
+
+            Return:
+                a numpy array with [idx(word), j] = count of the j-th distinct response (or 0)
+
+            Runtime: O(mn log(n)) with a shrinking n, independent of 3^k
+        """
+        cols = np.asarray(candidates, dtype=np.intp)
+        rows = None if rows is None else np.asarray(rows, dtype=np.intp)
+        num_rows = len(self.guess_list) if rows is None else len(rows)
+        if not len(cols) or not num_rows:
+            return np.zeros((num_rows, 1), dtype=np.int64)
+        chunk_size = max(1, self.wordle.max_chunk_elements // len(cols))
+        chunks = []
+        for start in range(0, num_rows, chunk_size):
+            codes = np.sort(self._response_codes(rows, start, start + chunk_size, cols), axis=1)
+            starts = np.ones(codes.shape, dtype=bool)
+            starts[:, 1:] = codes[:, 1:] != codes[:, :-1]
+            run_rows, run_starts = np.nonzero(starts)
+            # each run ends at the start of the next run in the same row, or at the end of the row
+            run_ends = np.append(run_starts[1:], len(cols))
+            run_ends[np.append(run_rows[1:] != run_rows[:-1], True)] = len(cols)
+            num_runs = np.bincount(run_rows, minlength=len(codes))
+            positions = np.arange(len(run_rows)) - (np.cumsum(num_runs) - num_runs)[run_rows]
+            counts = np.zeros((len(codes), num_runs.max()), dtype=np.int64)
+            counts[run_rows, positions] = run_ends - run_starts
+            chunks.append(counts)
+
+        distribution = np.zeros((num_rows, max(c.shape[1] for c in chunks)), dtype=np.int64)
+        start = 0
+        for counts in chunks:
+            distribution[start: start + len(counts), :counts.shape[1]] = counts
+            start += len(counts)
+        return distribution
+
+    @staticmethod
+    def entropy(distribution, in_order=False):
+        """
+            Compute the Shannon entropy of each row of response counts
+                the counts are sorted beforehand,
+                so that equal distributions always give exactly equal scores
+
+                when all rows have the same total (e.g. the candidates of a turn),
+                the entropy terms are looked up from a table of all possible counts
+
+                in_order: (boolean)
+                    set to True to add the terms of each row one by one,
+                    so that the scores are also exactly equal
+                    when padded with a different number of zero counts (see get_sparse_distribution)
+
+            Runtime: O(3^k * log(3^k)) per row
+        """
+        counts = np.sort(distribution, axis=-1)
+        totals = counts.sum(axis=-1, keepdims=True)
+        if totals.size and (totals == totals.flat[0]).all():
+            total = max(int(totals.flat[0]), 1)
+            px = np.arange(total + 1) / total
+            with np.errstate(divide="ignore", invalid="ignore"):
+                terms = np.where(px > 0, -px * np.log(px), 0.0)
+            terms = terms[counts]
+        else:
+            px = counts / np.maximum(totals, 1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                terms = np.where(counts > 0, -px * np.log(px), 0.0)
+        if not in_order:
+            return terms.sum(axis=-1)
+
+        # the leading zero terms (the same columns of all rows) are skipped, which leaves every sum unchanged
+        nonzero = np.nonzero(terms.reshape(-1, terms.shape[-1]).any(axis=0))[0]
+        scores = np.zeros(terms.shape[:-1])
+        for j in range(nonzero[0] if len(nonzero) else terms.shape[-1], terms.shape[-1]):
+            scores += terms[..., j]
+        return scores
+
+    def get_scores(self, distribution):
+        """
+            The entropies of a response distribution (see entropy),
+                which are independent of the padding of the sparse distributions of long words
+        """
+        return self.entropy(distribution, in_order=self.wordle.num_responses > self.max_dense_responses)
+
     def compute_score(self, word):
         """
             The score of a word
@@ -131,31 +401,118 @@ class MaxInformationGainWordlePlayer(BaseWordlePlayer):
 
             Runtime: O(3^k)
         """
-        word_idx = self.WORD_IDX["guess"][word]
-        total = sum(self.distribution[word_idx].values())
-        score = 0.0
-        for x in self.distribution[word_idx].values():
-            px = x*1.0/total
-            score += -px * np.log(px)
-        return score
+        return float(self.get_scores(self.current_distribution()[self.WORD_IDX["guess"][word]]))
 
     def give_guess(self, guess_words, candidates, history, fixed_guess=None, verbose=False):
         """
             Pick the guess word that has the maximum Shannon entropy
             (unless specified by the fixed guess)
 
-            Runtime: O(m*3^k)
+                the last word with the maximum score is picked among ties,
+                either from the entropies of all guess words at once
+                when the distribution of the candidates is already computed (e.g. at the first guess),
+                or by a pruned search otherwise (see search_guess)
+
+            Runtime: O(m*3^k) or see search_guess
         """
         if fixed_guess is not None:
             return fixed_guess, self.compute_score(fixed_guess)
 
-        guess, max_score = None, 0.0
-        for ind, word in enumerate(guess_words):
-            if word not in history:
-                score = self.compute_score(word)
-                if score >= max_score:
-                    guess, max_score = word, score
-        return guess, max_score
+        rows = self.guess_rows(guess_words, history)
+        if not len(rows):
+            return None, 0.0
+        if self.distribution is None:
+            row, score = self.search_guess(rows, candidates)
+        else:
+            scores = self.get_scores(self.distribution[rows])
+            best = len(scores) - 1 - int(np.argmax(scores[::-1]))
+            row, score = rows[best], float(scores[best])
+            self.num_scored = len(rows)
+        self.recent_guesses.append(row)
+        return self.guess_list[row], score
+
+    def guess_rows(self, guess_words, history):
+        """
+            Return:
+                the indices of the guess words in the guess list, excluding the previous guesses
+        """
+        if guess_words is self.guess_list:
+            rows = np.arange(len(self.guess_list))
+        else:
+            rows = np.array([self.WORD_IDX["guess"][word] for word in guess_words], dtype=np.intp)
+        excluded = [self.WORD_IDX["guess"][word] for word in history if word in self.WORD_IDX["guess"]]
+        return rows[~np.isin(rows, excluded)]
+
+    def search_guess(self, rows, candidates):
+        """
+            Find the last guess word (of the given indices) with the maximum entropy
+                without computing the distribution of every guess word:
+
+            Step 1. score the candidates and the recently picked guesses first,
+                the best of which is the best score so far
+            Step 2. skip every guess word whose entropy is bounded below the best score so far,
+                by the log of its number of possible distinct responses: min(n, max_responses)
+            Step 3. if the best score so far already splits the candidates into distinct responses,
+                the other words can only tie, so only the words after it are checked
+                (last first, for the first one that also splits the candidates)
+                else score all the words left
+
+            The result is the same as scoring all the guess words (see give_guess),
+                while the late turns only take O(n^2 + (words checked) * n log(n))
+                (the number of words checked is kept as num_scored)
+
+            Return:
+                the index of the guess word and its score
+
+            Runtime: O(mn) or O(m(n + 3^k)) in the worst case
+        """
+        cols = np.asarray(candidates, dtype=np.intp)
+        num_cols = len(cols)
+        target_rows = [self.WORD_IDX["guess"].get(self.wordle.words[i]) for i in cols]
+        tried = np.isin(rows, [row for row in target_rows if row is not None] + list(self.recent_guesses))
+        positions = np.nonzero(tried)[0]
+        scores = self.get_scores(self.get_distribution(cols, rows[positions]))
+        if len(positions):
+            best = len(scores) - 1 - int(np.argmax(scores[::-1]))
+            best_position, best_score = positions[best], float(scores[best])
+        else:
+            best_position, best_score = -1, -np.inf
+
+        max_responses = np.minimum(self.max_responses[rows], num_cols)
+        if best_position >= 0 and self._is_split(rows[best_position: best_position + 1], cols)[0]:
+            # the later words that can split the candidates, checked in growing blocks from the last
+            left = np.nonzero(~tried & (max_responses == num_cols))[0]
+            left = left[left > best_position][::-1]
+            start, block_size = 0, 64
+            while start < len(left):
+                block = left[start: start + block_size]
+                split = self._is_split(rows[block], cols)
+                if split.any():
+                    best_position = block[np.argmax(split)]
+                    best_score = float(self.get_scores(
+                        self.get_distribution(cols, rows[best_position: best_position + 1]))[0])
+                    start += int(np.argmax(split)) + 1
+                    break
+                start, block_size = start + len(block), block_size * 2
+            self.num_scored = len(positions) + start
+            return rows[best_position], best_score
+
+        bounds = np.log(np.maximum(max_responses, 1))
+        left = np.nonzero(~tried & (bounds + 1e-9 >= best_score))[0]
+        scores = np.concatenate([scores, self.get_scores(self.get_distribution(cols, rows[left]))])
+        positions = np.concatenate([positions, left])
+        self.num_scored = len(positions)
+        best_score = scores.max()
+        best_position = positions[scores == best_score].max()
+        return rows[best_position], float(best_score)
+
+    def _is_split(self, rows, cols):
+        """
+            Return:
+                whether each guess word (of the given indices) gives distinct responses to all the candidates
+        """
+        codes = np.sort(self.RESPONSES[rows[:, None], cols], axis=1)
+        return (codes[:, 1:] != codes[:, :-1]).all(axis=1)
 
     def get_response(self, guess, candidate):
         """
@@ -163,27 +520,36 @@ class MaxInformationGainWordlePlayer(BaseWordlePlayer):
 
             Runtime: O(1)
         """
-        return self.RESPONSES[self.WORD_IDX["guess"][guess]][self.WORD_IDX["target"][candidate]]
+        code = self.RESPONSES[self.WORD_IDX["guess"][guess], self.WORD_IDX["target"][candidate]]
+        return self.wordle.decode_response(code)
+
+    def get_response_codes(self, guess, candidates):
+        """
+            Get the response codes using the precomputed map
+
+            Runtime: O(n)
+        """
+        return self.RESPONSES[self.WORD_IDX["guess"][guess], candidates]
 
     def adjust_candidates(self, guess, response, candidates):
         """
             Update distributions with the latest available candidates
+                (computed on first use, see current_distribution)
 
-            Runtime: O(mnk) with a shrinking n
+            Runtime: O(n)
         """
         new_candidates = super().adjust_candidates(guess, response, candidates)
-        self.distribution = self.get_distribution(new_candidates)
+        self.candidates, self.distribution = new_candidates, None
 
         return new_candidates
 
-    @staticmethod
-    def should_pick_from(words):
+    def should_pick_from(self, candidates):
         """
-            Should pick from the words if there is only one choice
+            Should pick from the candidates if there is only one choice
 
             Runtime: O(1)
         """
-        return len(words) == 1
+        return len(candidates) == 1
 
     def print_initial_top_guesses(self, output_dir="output", output_name="top_scores"):
         return super().print_initial_top_guesses(output_dir, output_name + "_" + self.precompute)
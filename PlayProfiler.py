@@ -0,0 +1,172 @@
+import sys
+import json
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def _peak_memory_kb():
+    """
+        Return the peak resident memory of this process in KB, or None if unknown
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class PlayProfiler():
+    """
+        A collector of per-turn measurements of the games of a player,
+            enabled by setting it as the profiler of the player (player.profiler = PlayProfiler())
+
+        Each turn records the number of candidates, the time spent in each phase
+            (pick_guess, give_guess including get_distribution, get_response, adjust_candidates),
+            the number of guess words scored, whether the guess was a guess cache hit,
+            and the peak memory of the process.
+            A finished turn is passed to the callback (if any) and added to the aggregate summary.
+
+        The timed phases can be exported as a Chrome trace (see export_chrome_trace),
+            which can be loaded into chrome://tracing or Perfetto
+
+        Only the games played in this process are measured (not those of worker processes)
+    """
+
+    def __init__(self, callback=None, keep_events=True):
+        """
+            Initialize
+                callback: (function)
+                    called with the dict of each finished turn
+                keep_events: (boolean)
+                    set to False to keep only the summary and not the timed events for export
+        """
+        self.callback = callback
+        self.keep_events = keep_events
+        self.events = []
+        self.phases = {}
+        self.turns = {}
+        self.current = None
+
+    def begin_turn(self, turn, num_candidates):
+        """
+            Start the record of a turn (the number of guesses so far + 1)
+        """
+        self.current = {
+            "turn": turn,
+            "candidates": int(num_candidates),
+            "times": {},
+            "scored": 0,
+            "cache_hit": None,
+            "start": time.perf_counter()
+        }
+
+    def record(self, name, start, **info):
+        """
+            Record a phase that started at <start> (time.perf_counter) and ends now,
+                with any counters of the phase (e.g. scored, cache_hit) for the current turn
+        """
+        end = time.perf_counter()
+        stats = self.phases.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += end - start
+        stats["max"] = max(stats["max"], end - start)
+        if self.keep_events:
+            self.events.append((name, start, end, info))
+        if self.current is not None:
+            times = self.current["times"]
+            times[name] = times.get(name, 0.0) + end - start
+            if "scored" in info:
+                self.current["scored"] += info["scored"]
+            if "cache_hit" in info:
+                self.current["cache_hit"] = info["cache_hit"]
+
+    def end_turn(self):
+        """
+            Finish the record of the current turn
+
+            Return:
+                the dict of the turn
+        """
+        turn, self.current = self.current, None
+        if turn is None:
+            return None
+        start = turn.pop("start")
+        turn["total"] = time.perf_counter() - start
+        turn["peak_memory_kb"] = _peak_memory_kb()
+
+        stats = self.turns.setdefault(turn["turn"], {
+            "count": 0, "candidates": 0, "total": 0.0, "scored": 0, "cache_hits": 0})
+        stats["count"] += 1
+        stats["candidates"] += turn["candidates"]
+        stats["total"] += turn["total"]
+        stats["scored"] += turn["scored"]
+        stats["cache_hits"] += bool(turn["cache_hit"])
+        if self.keep_events:
+            self.events.append(("turn {}".format(turn["turn"]), start, start + turn["total"], {
+                "candidates": turn["candidates"], "scored": turn["scored"], "cache_hit": turn["cache_hit"]}))
+        if self.callback is not None:
+            self.callback(turn)
+        return turn
+
+    def summary(self):
+        """
+            Return:
+                a dict of the aggregate time of each phase (count, total, mean, max seconds),
+                the averages of each turn number (candidates, seconds, scored words, cache hits)
+                and the peak memory
+        """
+        return {
+            "phases": {
+                name: dict(stats, mean=stats["total"] / stats["count"])
+                for name, stats in self.phases.items()},
+            "turns": {
+                turn: {
+                    "count": stats["count"],
+                    "mean_candidates": stats["candidates"] / stats["count"],
+                    "mean_time": stats["total"] / stats["count"],
+                    "mean_scored": stats["scored"] / stats["count"],
+                    "cache_hit_rate": stats["cache_hits"] / stats["count"]}
+                for turn, stats in sorted(self.turns.items())},
+            "peak_memory_kb": _peak_memory_kb()
+        }
+
+    def format_summary(self):
+        """
+            Return:
+                a message of the summary
+        """
+        summary = self.summary()
+        lines = ["Profile by phase:"]
+        for name, stats in sorted(summary["phases"].items(), key=lambda x: -x[1]["total"]):
+            lines.append("  {:<18} count: {:>7}, total: {:>9.3f} s, mean: {:>8.3f} ms, max: {:>8.3f} ms".format(
+                name, stats["count"], stats["total"], stats["mean"] * 1000, stats["max"] * 1000))
+        lines.append("Profile by turn:")
+        for turn, stats in summary["turns"].items():
+            lines.append("  [{}] count: {:>7}, candidates: {:>8.1f}, time: {:>8.3f} ms, "
+                         "scored: {:>8.1f}, cache hits: {:.1%}".format(
+                             turn, stats["count"], stats["mean_candidates"], stats["mean_time"] * 1000,
+                             stats["mean_scored"], stats["cache_hit_rate"]))
+        if summary["peak_memory_kb"] is not None:
+            lines.append("Peak memory: {:.1f} MB".format(summary["peak_memory_kb"] / 1024))
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path):
+        """
+            Save the timed events in the Chrome trace event format (JSON)
+        """
+        origin = min(start for _, start, _, _ in self.events) if self.events else 0.0
+        trace_events = [{
+            "name": name,
+            "ph": "X",
+            "ts": (start - origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": 0,
+            "tid": 0,
+            "args": info
+        } for name, start, end, info in sorted(self.events, key=lambda x: (x[1], -x[2]))]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+            print("{} saved.".format(f.name))
@@ -0,0 +1,298 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import multiprocessing
+from contextlib import contextmanager
+import numpy as np
+from utility import _save_array, _load_array
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# the function computing the rows of a chunk in each worker process, set once by _init_chunk_worker
+_worker_compute_rows = None
+
+
+def _init_chunk_worker(compute_rows):
+    global _worker_compute_rows
+    _worker_compute_rows = compute_rows
+
+
+def _compute_chunk(task):
+    start, stop = task
+    return start, _worker_compute_rows(start, stop)
+
+
+class PrecomputeCache():
+    """
+        A content-addressed cache of precomputed arrays stored in a directory
+
+            each entry is keyed by its name and a hash of its meta fields
+            (e.g. word list contents, k and rformat),
+            so that different word lists never share or overwrite an entry
+
+            entries are written atomically (temp file + rename) under a file lock,
+            and the least recently used entries are evicted
+            once the total size exceeds <max_bytes>
+
+            a large entry can be built in chunks of rows across a process pool
+            (see get_or_compute_chunked), which resumes after an interruption
+    """
+
+    def __init__(self, cache_dir="output", max_bytes=2 ** 30):
+        """
+            Initialize
+                cache_dir: (str)
+                    the directory to store the entries
+                max_bytes: (int)
+                    the maximum total size of all entries, default 1 GiB
+                    (None for no limit)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(name, meta):
+        """
+            Return the entry key, "<name>_<hash(meta)>"
+        """
+        digest = hashlib.sha1(json.dumps(meta, sort_keys=True).encode("utf-8")).hexdigest()
+        return "{}_{}".format(name, digest[:16])
+
+    def path(self, name, meta):
+        """
+            Return the file path of an entry
+        """
+        return os.path.join(self.cache_dir, self.key(name, meta) + ".bin")
+
+    def load(self, name, meta):
+        """
+            Open an entry as a read-only memory map and mark it as recently used
+
+            Return:
+                the array, or None if the entry does not exist
+        """
+        path = self.path(name, meta)
+        array = _load_array(path, meta)
+        if array is not None:
+            os.utime(path)
+        return array
+
+    def save(self, name, meta, array):
+        """
+            Write an entry atomically,
+                so that readers never see a partially written file
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            _save_array(tmp_path, array, meta)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path(name, meta))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_or_compute(self, name, meta, compute, verbose=True):
+        """
+            Return the cached entry,
+                or compute it with <compute>() and cache it if it does not exist
+
+            Only one process computes a missing entry at a time,
+                the others wait for the lock and then load the saved entry
+        """
+        array = self.load(name, meta)
+        if array is not None:
+            return array
+
+        with self._lock(name, meta):
+            array = self.load(name, meta)
+            if array is None:
+                self.save(name, meta, compute())
+                if verbose:
+                    print("{} saved.".format(self.path(name, meta)))
+                array = self.load(name, meta)
+        self.evict(keep=self.path(name, meta))
+        return array
+
+    def get_or_compute_chunked(self, name, meta, shape, dtype, compute_rows, chunk_rows=256,
+                               processes=1, initial=None, verbose=True):
+        """
+            Return the cached entry,
+                or compute it in chunks of rows and cache it if it does not exist
+
+            Each finished chunk is saved atomically in "<key>.parts/" with a manifest of the finished chunks,
+                so that an interrupted build resumes from the remaining chunks,
+                and the entry itself is only saved once all chunks are finished
+
+            Parameters:
+                shape: (tuple of int)
+                    the shape of the entry
+                dtype:
+                    the data type of the entry
+                compute_rows: (function)
+                    return the rows [start, stop) of the entry given (start, stop),
+                    picklable if computed across processes
+                chunk_rows: (int)
+                    the number of rows of each chunk
+                processes: (int)
+                    the number of worker processes (None to use all CPUs)
+                initial: (function)
+                    return the whole entry (e.g. migrated from another format) or None to compute it
+        """
+        array = self.load(name, meta)
+        if array is not None:
+            return array
+
+        with self._lock(name, meta):
+            array = self.load(name, meta)
+            if array is None:
+                complete = initial() if initial is not None else None
+                if complete is None:
+                    complete = self._build_chunks(
+                        name, meta, shape, dtype, compute_rows, chunk_rows, processes, verbose)
+                self.save(name, meta, complete)
+                if verbose:
+                    print("{} saved.".format(self.path(name, meta)))
+                shutil.rmtree(self._parts_dir(name, meta), ignore_errors=True)
+                array = self.load(name, meta)
+        self.evict(keep=self.path(name, meta))
+        return array
+
+    def _parts_dir(self, name, meta):
+        return self.path(name, meta)[:-len(".bin")] + ".parts"
+
+    def _build_chunks(self, name, meta, shape, dtype, compute_rows, chunk_rows, processes, verbose):
+        """
+            Compute the unfinished chunks of an entry (see get_or_compute_chunked)
+
+            Return:
+                the whole entry
+        """
+        parts_dir = self._parts_dir(name, meta)
+        manifest_path = os.path.join(parts_dir, "manifest.json")
+        os.makedirs(parts_dir, exist_ok=True)
+
+        def _chunk_path(start):
+            return os.path.join(parts_dir, "rows_{}.npy".format(start))
+
+        def _write_atomic(path, write):
+            fd, tmp_path = tempfile.mkstemp(dir=parts_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    write(f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        manifest = {"meta": meta, "shape": list(shape), "dtype": np.dtype(dtype).str,
+                    "chunk_rows": chunk_rows, "done": []}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                previous = json.load(f)
+            if all(previous.get(field) == manifest[field] for field in ("meta", "shape", "dtype", "chunk_rows")):
+                manifest["done"] = [start for start in previous["done"] if os.path.exists(_chunk_path(start))]
+        done = set(manifest["done"])
+        tasks = [(start, min(start + chunk_rows, shape[0]))
+                 for start in range(0, shape[0], chunk_rows) if start not in done]
+        if verbose and done:
+            print("Resuming from {} of {} finished chunks...".format(len(done), len(done) + len(tasks)))
+
+        def _finish(start, rows):
+            rows = np.asarray(rows, dtype=dtype)
+            if rows.shape != (min(start + chunk_rows, shape[0]) - start,) + tuple(shape[1:]):
+                raise ValueError("chunk at row {} has a wrong shape {}".format(start, rows.shape))
+            _write_atomic(_chunk_path(start), lambda f: np.save(f, rows))
+            manifest["done"].append(start)
+            _write_atomic(manifest_path, lambda f: f.write(json.dumps(manifest).encode("utf-8")))
+
+        if processes == 1 or len(tasks) <= 1 or multiprocessing.current_process().daemon:
+            for start, stop in tasks:
+                _finish(start, compute_rows(start, stop))
+        else:
+            with multiprocessing.Pool(processes, initializer=_init_chunk_worker, initargs=(compute_rows,)) as pool:
+                for start, rows in pool.imap_unordered(_compute_chunk, tasks):
+                    _finish(start, rows)
+                    if verbose:
+                        print("{} / {} chunks".format(len(manifest["done"]), len(done) + len(tasks)), end="\r")
+            if verbose:
+                print("")
+
+        array = np.empty(shape, dtype=dtype)
+        for start in range(0, shape[0], chunk_rows):
+            array[start: start + chunk_rows] = np.load(_chunk_path(start))
+        return array
+
+    def entries(self):
+        """
+            Return a list of (path, size, last used time) of all entries,
+                ordered from the least recently used
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(".bin"):
+                path = os.path.join(self.cache_dir, file_name)
+                stat = os.stat(path)
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda x: x[2])
+
+    def evict(self, keep=None):
+        """
+            Remove the least recently used entries (except <keep>)
+                with their lock files and unfinished chunks
+                until the total size is within <max_bytes>
+
+            (an entry that is currently memory-mapped stays readable after removal)
+        """
+        if self.max_bytes is None:
+            return
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                self._remove_entry(path)
+                total -= size
+
+    def _remove_entry(self, path):
+        """
+            Remove an entry together with its lock file and any unfinished chunks ("<key>.parts/")
+
+            (a process waiting on the removed lock may compute the entry again, which is harmless
+            since entries are written atomically)
+        """
+        stem = path[:-len(".bin")]
+        for file_path in (path, stem + ".lock"):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+        shutil.rmtree(stem + ".parts", ignore_errors=True)
+
+    @contextmanager
+    def _lock(self, name, meta):
+        """
+            Hold an exclusive lock on an entry across processes
+                (a no-op on platforms without fcntl)
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.path(name, meta)[:-len(".bin")] + ".lock", "w") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,241 @@
+import time
+import uuid
+from collections import OrderedDict, deque
+import numpy as np
+
+
+class UnknownSessionError(LookupError):
+    """
+        Raised for a session id that was never started, or already ended or expired
+    """
+
+
+class SolverSession():
+    """
+        The state of a game served by SolverService:
+            the candidates packed as a bit mask over the Wordle list (n/8 bytes),
+            the previous guesses, the current guess, the time of the last request
+            and in hard mode the legal guesses packed as a bit mask over the guess list (m/8 bytes)
+    """
+    __slots__ = ("mask", "history", "guess", "last_active", "legal")
+
+    def __init__(self, mask, history, guess, legal=None):
+        self.mask = mask
+        self.history = history
+        self.guess = guess
+        self.last_active = time.monotonic()
+        self.legal = legal
+
+
+class SolverService():
+    """
+        Serving the guesses of one player to many concurrent games (sessions)
+
+        The player (with the Wordle list and any precomputed responses) is loaded once
+            and shared by all sessions, while each session only keeps its candidate mask.
+            At each request the player is synchronized with the candidates of the session
+            (see BaseWordlePlayer.adjust_candidates), so requests must be handled one at a time,
+            e.g. on an asyncio event loop (see server.serve).
+            Game states reached by many sessions are served from the guess cache of the player.
+
+        In hard mode, every guess of a session must be consistent with its previous hints
+            (see ConstraintIndex)
+
+        Sessions idle for more than <session_timeout> seconds are dropped,
+            as well as the least recently used sessions beyond <max_sessions>.
+            The latency of the requests is recorded per route (see latency_stats)
+    """
+
+    def __init__(self, player, first_guess=None, max_sessions=2 ** 16, session_timeout=3600,
+                 latency_window=2 ** 16, hard_mode=False):
+        """
+            Initialize
+                player: a deterministic player object (see BaseWordlePlayer)
+                first_guess: (str)
+                    if supplied, uses it as the first guess of every session
+                max_sessions: (int)
+                    the maximum number of open sessions
+                session_timeout: (float)
+                    the seconds before an idle session is dropped
+                latency_window: (int)
+                    the number of latest requests per route to compute the latency percentiles
+                hard_mode: (boolean)
+                    set to True to play every session in hard mode
+        """
+        self.player = player
+        self.wordle = player.wordle
+        self.first_guess = player.lowercase(first_guess)
+        self.max_sessions = max_sessions
+        self.session_timeout = session_timeout
+        self.latency_window = latency_window
+        self.hard_mode = hard_mode
+        self.guess_set = set(player.guess_list)
+        self.sessions = OrderedDict()
+        self.latencies = {}
+        self._first = None
+
+    def _pack(self, candidates):
+        mask = np.zeros(len(self.wordle.words), dtype=bool)
+        mask[candidates] = True
+        return np.packbits(mask)
+
+    def _unpack(self, mask):
+        return np.flatnonzero(np.unpackbits(mask, count=len(self.wordle.words)))
+
+    def _expire(self):
+        """
+            Drop the idle sessions and the least recently used sessions beyond the limit
+
+            Runtime: O(1) amortized
+        """
+        deadline = time.monotonic() - self.session_timeout
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if session.last_active >= deadline and len(self.sessions) <= self.max_sessions:
+                break
+            del self.sessions[session_id]
+
+    def _get(self, session_id):
+        """
+            Return the session and mark it as recently used
+                (UnknownSessionError for unknown or expired sessions)
+        """
+        self._expire()
+        if session_id not in self.sessions:
+            raise UnknownSessionError("unknown session '{}'".format(session_id))
+        session = self.sessions[session_id]
+        session.last_active = time.monotonic()
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def _payload(self, session_id, session, score, num_candidates):
+        return {
+            "session": session_id,
+            "guess": session.guess,
+            "score": score,
+            "num_guess": len(session.history) + 1,
+            "candidates": int(num_candidates),
+            "solved": False
+        }
+
+    def start(self):
+        """
+            Start a session with the first guess
+                (computed once, since every session starts from the same state)
+
+            Return:
+                a dict of the session id, the guess and its score, and the number of candidates
+        """
+        if self._first is None:
+            self.player.reset()
+            candidates = np.arange(len(self.wordle.words))
+            legal = self.player.constraint_index.all() if self.hard_mode else None
+            guess, score = self.player.pick_guess(candidates, set(), fixed_guess=self.first_guess, legal=legal)
+            self._first = (self._pack(candidates), guess, score, None if legal is None else np.packbits(legal))
+        mask, guess, score, legal = self._first
+
+        session_id = uuid.uuid4().hex
+        session = SolverSession(mask, (), guess, legal)
+        self.sessions[session_id] = session
+        self._expire()
+        return self._payload(session_id, session, score, len(self.wordle.words))
+
+    def observe(self, session_id, guess, response):
+        """
+            Submit the response to a guess of a session
+                (the current guess of the session if <guess> is not given)
+                and get the next guess
+
+            Return:
+                a dict as start(), with "solved" = True once the response is correct,
+                or "guess" = None if no candidate is left
+
+            Runtime: O(adjust_candidates + give_guess), O(n) for memoized game states
+        """
+        session = self._get(session_id)
+        if guess is not None and not isinstance(guess, str):
+            raise ValueError("invalid guess '{}': must be a word".format(guess))
+        guess = self.player.lowercase(guess) or session.guess
+        if guess not in self.guess_set:
+            raise ValueError("invalid guess '{}': not in the guess list".format(guess))
+        if not isinstance(response, str) or not self.wordle.validate_response(response):
+            raise ValueError("invalid response '{}': {}".format(
+                response, self.wordle.get_response_description()))
+        legal = None
+        if session.legal is not None:
+            legal = np.unpackbits(session.legal, count=len(self.player.guess_list)).astype(bool)
+            if not self.player.constraint_index.is_legal(legal, guess):
+                raise ValueError(
+                    "invalid guess '{}': not consistent with the previous hints in hard mode".format(guess))
+
+        history = session.history + (guess,)
+        if self.wordle.is_correct_response(response):
+            del self.sessions[session_id]
+            return {"session": session_id, "guess": guess, "score": None,
+                    "num_guess": len(history), "candidates": 1, "solved": True}
+
+        candidates = self.player.adjust_candidates(guess, response, self._unpack(session.mask))
+        if legal is not None:
+            legal = self.player.constraint_index.constrain(legal, guess, response)
+            session.legal = np.packbits(legal)
+        score = None
+        if len(candidates):
+            session.guess, score = self.player.pick_guess(candidates, set(history), legal=legal)
+        else:
+            session.guess = None
+        session.mask, session.history = self._pack(candidates), history
+        return self._payload(session_id, session, score, len(candidates))
+
+    def status(self, session_id):
+        """
+            Return:
+                a dict of the current guess, the previous guesses and the candidates of a session
+        """
+        session = self._get(session_id)
+        candidates = self._unpack(session.mask)
+        return {
+            "session": session_id,
+            "guess": session.guess,
+            "history": list(session.history),
+            "candidates": len(candidates),
+            "candidate_words": self.player.candidate_words(candidates) if len(candidates) <= 100 else None
+        }
+
+    def end(self, session_id):
+        """
+            Close a session
+        """
+        self._get(session_id)
+        del self.sessions[session_id]
+        return {"session": session_id, "closed": True}
+
+    def record_latency(self, route, seconds):
+        if route not in self.latencies:
+            self.latencies[route] = [0, deque(maxlen=self.latency_window)]
+        self.latencies[route][0] += 1
+        self.latencies[route][1].append(seconds)
+
+    def latency_stats(self):
+        """
+            Return:
+                {route: {"count", "p50_ms", "p99_ms"}} over the latest requests of each route
+        """
+        stats = {}
+        for route, (count, window) in self.latencies.items():
+            p50, p99 = np.percentile(np.array(window) * 1000, [50, 99])
+            stats[route] = {"count": count, "p50_ms": round(float(p50), 3), "p99_ms": round(float(p99), 3)}
+        return stats
+
+    def stats(self):
+        """
+            Return:
+                a dict of the number of open sessions, the latencies and the guess cache counters
+        """
+        self._expire()
+        cache = self.player.guess_cache
+        return {
+            "sessions": len(self.sessions),
+            "latency": self.latency_stats(),
+            "guess_cache": None if cache is None else {
+                "hits": cache.hits, "misses": cache.misses, "entries": len(cache)}
+        }
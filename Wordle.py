@@ -6,27 +6,37 @@ import numpy as np
 class Wordle():
     """
         A Wordle object
-            specifies a list of n words with k-letters (as the target pool)
+            specifies a list of n words with k-letters (as the target pool, in lowercase)
             and the characters used in the response-to-guess output string
 
-            also precomputes a response-to-code mapping O(k*3^k)
+            responses are encoded as integers of base 3 (see encode_response),
+            with each code fitting in the smallest integer type <code_dtype>,
+            and the mappings are memoized for the responses in use only (instead of all 3^k)
 
     """
+    # the maximum number of intermediate elements for each chunk in response_matrix
+    max_chunk_elements = 2 ** 20
+
     def __init__(self, k, words, rformat=["0", "1", "2"]):
         self.k = k
-        self.words = [x for x in words if len(x) == k]
+        self.words = [x.lower() for x in words if len(x) == k]
         if not self.words:
             raise ValueError("input words do not contain {}-letter words!".format(k))
         self.rformat = rformat
-        if len(rformat) != 3 and any([len(x) > 1 for x in rformat]):
+        if len(rformat) != 3 or any([len(x) != 1 for x in rformat]):
             raise ValueError("wrong response format: must be a list of three single characters")
-        self.response_to_idx, self.idx_to_response = self._precompute_response_code()
+        self.num_responses = 3 ** k
+        self.code_dtype = np.min_scalar_type(self.num_responses - 1)
+        self._rformat_idx = {r: idx for idx, r in enumerate(rformat)}
+        self._code_memo, self._response_memo = {}, {}
+        self.letters = self._letter_array(self.words)
 
-    def generate_target(self):
+    def generate_target(self, rng=None, words=None):
         """
-            uniformly generate a choice from words
+            uniformly generate a choice from words (default the Wordle list),
+                with a random.Random object for seeded choices (default the random module)
         """
-        return random.choice(self.words)
+        return (random if rng is None else rng).choice(self.words if words is None else words)
 
     def response_to_guess(self, guess, target):
         """
@@ -70,6 +80,89 @@ class Wordle():
 
         return "".join(response)
 
+    def response_matrix(self, guesses, targets, chunk_size=None):
+        """
+            Generate the response codes (see encode_response) of all guesses
+                with respect to all targets at once, vectorized over letter arrays
+
+            A letter at a wrong position is marked as "1" only if the target
+                still has unmatched appearances of that letter after
+                the exact matches and the earlier appearances in the guess,
+                which gives the same responses as response_to_guess
+
+            Parameters:
+                guesses: (list of str)
+                targets: (list of str)
+                (optional) chunk_size: (int)
+                    the number of guesses to compute at a time,
+                    default to keep each chunk within <max_chunk_elements>
+
+            Return:
+                a numpy array with [idx(guess), idx(target)] = code(response)
+
+            Runtime: O(k^2) for each guess and each target
+        """
+        guess_letters, target_letters = self._letter_array(guesses), self._letter_array(targets)
+        if chunk_size is None:
+            chunk_size = max(1, self.max_chunk_elements // max(1, len(targets) * self.k))
+
+        codes = np.empty((len(guess_letters), len(target_letters)), dtype=self.code_dtype)
+        for start in range(0, len(guess_letters), chunk_size):
+            codes[start: start + chunk_size] = self._response_codes(
+                guess_letters[start: start + chunk_size], target_letters)
+        return codes
+
+    def response_codes(self, guess, target_idx=None):
+        """
+            Generate the response codes of a guess
+                with respect to the targets words[target_idx] (default all words)
+
+            Return:
+                a numpy array of code(response) for each target
+
+            Runtime: O(k^2) for each target
+        """
+        target_letters = self.letters if target_idx is None else self.letters[target_idx]
+        guess_letters = self._letter_array([guess])
+        return self._response_codes(guess_letters, target_letters)[0].astype(self.code_dtype)
+
+    def _response_codes(self, guess_letters, target_letters):
+        """
+            Vectorized response codes between arrays of character codes,
+                see response_matrix
+
+            Return:
+                a numpy array with [idx(guess), idx(target)] = code(response)
+        """
+        if guess_letters.dtype != target_letters.dtype:
+            guess_letters, target_letters = guess_letters.astype(np.int32), target_letters.astype(np.int32)
+        g = guess_letters[:, None, :]
+        exact = g == target_letters[None, :, :]
+        unmatched = ~exact
+
+        # available[i]: unmatched appearances of the i-th guess letter in the target
+        # used[i]: appearances of the i-th guess letter at earlier unmatched guess positions
+        available = np.zeros(exact.shape, dtype=np.uint8)
+        used = np.zeros(exact.shape, dtype=np.uint8)
+        for p in range(self.k):
+            available += (g == target_letters[None, :, p, None]) & unmatched[:, :, p, None]
+            used[:, :, p + 1:] += (g[:, :, p + 1:] == g[:, :, p, None]) & unmatched[:, :, p, None]
+        misplaced = unmatched & (used < available)
+
+        codes = np.zeros(exact.shape[:2], dtype=np.int64)
+        for i in range(self.k - 1, -1, -1):
+            codes = codes * 3 + 2 * exact[:, :, i] + misplaced[:, :, i]
+        return codes
+
+    def _letter_array(self, words):
+        """
+            Convert words to an array of character codes, O(k) per word
+        """
+        if any(len(w) != self.k for w in words):
+            raise ValueError("input words must all be {}-letter words".format(self.k))
+        letters = np.array([[ord(c) for c in w] for w in words], dtype=np.int32).reshape(-1, self.k)
+        return letters.astype(np.uint8) if letters.size and letters.max() < 256 else letters
+
     def get_response_description(self):
         """
             Return a string that specifies the response format
@@ -98,45 +191,43 @@ class Wordle():
     def _encode_response(self, response):
         """
             Encode each response as an integer, O(k)
+                digit i (of base 3) is the index of the i-th character in rformat
         """
-        response_score = {r: idx for idx, r in enumerate(self.rformat)}
+        if len(response) != self.k:
+            raise KeyError(response)
         code = 0
-        for i, r in enumerate(response):
-            code += (response_score[r] * 3 ** i)
+        for r in reversed(response):
+            code = code * 3 + self._rformat_idx[r]
         return code
 
     def _decode_response(self, code):
         """
             Decode each response code back to the original response, O(k)
         """
-        response = ""
-        for i in range(self.k-1, -1, -1):
-            response = str(int(np.floor(code / (3 ** i)))) + response
-            code %= (3**i)
-        assert self.validate_response(response)
-        return response
-
-    def _precompute_response_code(self):
-        """
-            Precompute the encode mapping for each response, O(k*3^k)
-        """
-        response_to_idx = {}
-        idx_to_response = []
-
-        for i in range(3**self.k):
-            response = self._decode_response(i)
-            idx_to_response.append(response)
-            response_to_idx[response] = i
-        return response_to_idx, idx_to_response
+        if not 0 <= code < self.num_responses:
+            raise IndexError("response code {} out of range".format(code))
+        response = []
+        for _ in range(self.k):
+            code, digit = divmod(code, 3)
+            response.append(self.rformat[digit])
+        return "".join(response)
 
     def encode_response(self, response):
         """
             Provide the response code
+                (computed on first use of each response, O(k), then memoized)
         """
-        return self.response_to_idx[response]
+        code = self._code_memo.get(response)
+        if code is None:
+            code = self._code_memo[response] = self._encode_response(response)
+        return code
 
     def decode_response(self, code):
         """
             Provide the original response
+                (computed on first use of each code, O(k), then memoized)
         """
-        return self.idx_to_response[code]
+        response = self._response_memo.get(code)
+        if response is None:
+            response = self._response_memo[int(code)] = self._decode_response(int(code))
+        return response
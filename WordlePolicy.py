@@ -0,0 +1,177 @@
+import numpy as np
+
+
+class PolicyNode():
+    """
+        A game state in a compiled policy:
+            the available candidates, the previous guesses,
+            the guess (and its score) given at this state,
+            the next states for each possible response code (None until expanded)
+            and the legal guess words in hard mode (None once expanded or if not in hard mode)
+    """
+    __slots__ = ("candidates", "history", "guess", "score", "children", "legal")
+
+    def __init__(self, candidates, history, guess, score, legal=None):
+        self.candidates = candidates
+        self.history = history
+        self.guess = guess
+        self.score = score
+        self.children = None
+        self.legal = legal
+
+
+class WordlePolicy():
+    """
+        A decision tree compiled from a deterministic player with a fixed first guess
+            (e.g. HeuristicWordlePlayer, MaxInformationGainWordlePlayer)
+
+        Since such a player always gives the same guess for the same candidates,
+            each distinct game state is evaluated by the player only once,
+            by splitting the candidates with the response codes of each guess.
+            Afterwards games are replayed from the tree without computing any scores.
+
+        Nodes are expanded lazily on first visit,
+            or all at once by compile() (see compile_policy)
+
+        A policy in hard mode only gives guesses consistent with all previous hints
+            (see ConstraintIndex)
+
+        Runtime:
+            Compile: num_states * O(give_guess + adjust_candidates)
+            Replay: O(depth) lookups per game
+    """
+
+    def __init__(self, player, first_guess=None, hard_mode=False):
+        """
+            Initialize
+                player: a player object (see BaseWordlePlayer)
+                first_guess: (str)
+                    if supplied, uses it as the first guess
+                hard_mode: (boolean)
+                    set to True to only guess words consistent with all previous hints
+        """
+        self.player = player
+        self.wordle = player.wordle
+        self.hard_mode = hard_mode
+        self.word_idx = {word: idx for idx, word in enumerate(self.wordle.words)}
+        self.solved_code = self.wordle.encode_response(self.wordle.rformat[2] * self.wordle.k)
+
+        player.reset()
+        self.root = self._new_node(
+            np.arange(len(self.wordle.words)), frozenset(), player.lowercase(first_guess),
+            legal=player.constraint_index.all() if hard_mode else None)
+
+    def _new_node(self, candidates, history, fixed_guess=None, legal=None):
+        """
+            Ask the player for the guess at a game state
+                (the player's own state must already match the candidates)
+        """
+        guess, score = self.player.pick_guess(
+            candidates, set(history), fixed_guess=fixed_guess, verbose=False, legal=legal)
+        return PolicyNode(candidates, history, guess, score, legal)
+
+    def expand(self, node):
+        """
+            Create the next states of a node for every response its guess can get
+        """
+        codes = self.player.get_response_codes(node.guess, node.candidates)
+        history = node.history | {node.guess}
+        legal, node.legal = node.legal, None
+        node.children = {}
+        for code in np.unique(codes):
+            if code == self.solved_code:
+                continue
+            response = self.wordle.decode_response(code)
+            candidates = self.player.adjust_candidates(node.guess, response, node.candidates)
+            if legal is not None:
+                node.children[int(code)] = self._new_node(
+                    candidates, history, legal=self.player.constraint_index.constrain(legal, node.guess, response))
+            else:
+                node.children[int(code)] = self._new_node(candidates, history)
+
+    def child(self, node, response):
+        """
+            Return:
+                the next state after a response to the guess of the node,
+                or None if no candidate can give such a response
+        """
+        if node.children is None:
+            self.expand(node)
+        return node.children.get(self.wordle.encode_response(response))
+
+    def compile(self):
+        """
+            Expand all game states reachable from the root
+
+            Return:
+                the policy itself
+        """
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.children is None:
+                self.expand(node)
+            stack.extend(node.children.values())
+        return self
+
+    def play(self, target):
+        """
+            Replay the game of a target
+
+            Return:
+                the number of total guesses (int)
+                the list of (guess, response) at each step (list)
+        """
+        node, trace = self.root, []
+        while node is not None:
+            response = self.player.get_response(node.guess, target)
+            trace.append((node.guess, response))
+            if self.wordle.is_correct_response(response):
+                return len(trace), trace
+            node = self.child(node, response)
+
+    def traces(self):
+        """
+            Collect the games of all targets from the tree (expanding it if needed)
+
+            Return:
+                a list of the trace (see play) for each word of the Wordle list
+        """
+        traces = [None] * len(self.wordle.words)
+        solved = self.wordle.decode_response(self.solved_code)
+        stack = [(self.root, [])]
+        while stack:
+            node, path = stack.pop()
+            if node.guess in self.word_idx and self.word_idx[node.guess] in node.candidates:
+                traces[self.word_idx[node.guess]] = path + [(node.guess, solved)]
+            if node.children is None:
+                self.expand(node)
+            for code, child in node.children.items():
+                stack.append((child, path + [(node.guess, self.wordle.decode_response(code))]))
+        return traces
+
+    def num_guesses(self):
+        """
+            Return:
+                a list of the number of guesses for each word of the Wordle list
+        """
+        return [len(trace) for trace in self.traces()]
+
+    def num_states(self):
+        """
+            Return:
+                the number of expanded game states
+        """
+        count, stack = 0, [self.root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend((node.children or {}).values())
+        return count
+
+
+def compile_policy(player, first_guess=None, hard_mode=False):
+    """
+        Compile the full decision tree of a deterministic player (see WordlePolicy)
+    """
+    return WordlePolicy(player, first_guess, hard_mode).compile()
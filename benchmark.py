@@ -0,0 +1,341 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import platform
+import subprocess
+import numpy as np
+from utility import _get_output_path
+
+
+def _timeit(fn, repeat=5, number=None, min_run_time=0.05):
+    """
+        Time a function
+            (by default each run makes enough calls to last at least <min_run_time> seconds,
+            estimated from a first call)
+
+        Return:
+            a dict of the min/median/mean seconds per call over <repeat> runs of <number> calls
+    """
+    if number is None:
+        start = time.perf_counter()
+        fn()
+        number = max(1, int(min_run_time / max(time.perf_counter() - start, 1e-9)))
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min": min(times),
+        "median": float(np.median(times)),
+        "mean": float(np.mean(times))
+    }
+
+
+def machine_info():
+    """
+        Return:
+            a dict describing the machine, the interpreter and the code version of a run
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "commit": commit
+    }
+
+
+def time_startup(solver, first_guess="raise"):
+    """
+        Time an interactive session of main.py (in a new process)
+            until its first suggestion is printed
+
+        Return:
+            the seconds to the first suggestion
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-u", "main.py", "--solver", solver, "--first_guess", first_guess, "interactive"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        for line in process.stdout:
+            if "Picked Guess" in line:
+                return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+    raise RuntimeError("no suggestion from main.py --solver {}".format(solver))
+
+
+def _turn_states(player, first_guess, targets, num_turns=3):
+    """
+        Play the games of the targets step by step (see GameState)
+            and keep a typical state of each turn:
+            the game with the median number of candidates among those still playing
+
+        Return:
+            a list of (candidates, history, snapshot, guess, response) for each turn
+    """
+    from GameState import GameState
+
+    turns = [[] for _ in range(num_turns)]
+    for target in targets:
+        game = GameState(player, first_guess)
+        for turn in range(num_turns):
+            if game.done:
+                break
+            candidates, history, snapshot = game.candidates, set(game.history), game.snapshot
+            guess, _ = game.next_guess()
+            response = player.get_response(guess, target)
+            turns[turn].append((candidates, history, snapshot, guess, response))
+            game.observe(response)
+    return [sorted(states, key=lambda x: len(x[0]))[len(states) // 2] for states in turns if states]
+
+
+def random_words(k, num_words, seed=0, letters="etaoinshrdlucmfwyp"):
+    """
+        Return a sorted list of distinct random k-letter words (for word lengths without a word list)
+    """
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < num_words:
+        words.add("".join(rng.choice(letters) for _ in range(k)))
+    return sorted(words)
+
+
+def run_benchmarks(large=True, repeat=5, heavy_repeat=1, first_guess="raise", lengths=range(3, 13),
+                   verbose=True):
+    """
+        Time the hot paths of the solvers:
+            the startup of an interactive session of main.py until the first suggestion,
+            responses of Wordle, the precompute of the MIG solver (cold and warm),
+            get_distribution, give_guess and adjust_candidates at typical states of the first turns,
+            and the full first guess performance of each solver with the small/large guess list
+
+            and for each word length k in <lengths>, on random k-letter words:
+            the construction of Wordle, the response matrix, and the games of each solver
+
+        Parameters:
+            large: (boolean)
+                set to False to skip the solvers with the large guess list
+            repeat: (int)
+                the number of runs of each fast benchmark
+            heavy_repeat: (int)
+                the number of runs of the precompute and first guess performance benchmarks
+            lengths: (list of int)
+                the word lengths to benchmark
+
+        Return:
+            a dict of the machine info and {name: timing} of each benchmark (see _timeit)
+    """
+    from main import get_words, get_first_guess_performance
+    from Wordle import Wordle
+    from PrecomputeCache import PrecomputeCache
+    from HeuristicWordlePlayer import HeuristicWordlePlayer
+    from MaxInformationGainWordlePlayer import MaxInformationGainWordlePlayer
+
+    results = {}
+
+    def _record(name, timing, **info):
+        timing.update(info)
+        results[name] = timing
+        if verbose:
+            print("{:<48} median {:>10.3f} ms{}".format(
+                name, timing["median"] * 1000,
+                "".join(", {}: {}".format(key, value) for key, value in info.items())))
+
+    for solver in (["heuristic", "small-mig", "large-mig"] if large else ["heuristic", "small-mig"]):
+        # the first session may fill the precompute cache
+        time_startup(solver, first_guess)
+        _record("main.startup.{}".format(solver), _timeit(
+            lambda: time_startup(solver, first_guess), repeat, number=1))
+
+    wordle = Wordle(5, get_words("small"))
+    rng = random.Random(0)
+    pairs = [(rng.choice(wordle.words), rng.choice(wordle.words)) for _ in range(10000)]
+    timing = _timeit(lambda: [wordle.response_to_guess(guess, target) for guess, target in pairs], repeat)
+    _record("wordle.response_to_guess", timing, pairs=len(pairs),
+            pairs_per_second=round(len(pairs) / timing["median"]))
+    responses = [wordle.response_to_guess(guess, target) for guess, target in pairs]
+    _record("wordle.encode_decode_response", _timeit(
+        lambda: [wordle.decode_response(wordle.encode_response(r)) for r in responses], repeat))
+
+    targets = wordle.words[::50]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for size in (["small", "large"] if large else ["small"]):
+            guess_list = get_words(size)
+
+            def _load(cache):
+                player = MaxInformationGainWordlePlayer(wordle, guess_list, precompute=size, cache=cache)
+                player.RESPONSES
+                player.reset()
+
+            def _cold():
+                # run from an empty directory, so that no legacy precompute is migrated instead
+                cwd = os.getcwd()
+                with tempfile.TemporaryDirectory() as cold_dir:
+                    os.chdir(cold_dir)
+                    try:
+                        _load(PrecomputeCache(cold_dir))
+                    finally:
+                        os.chdir(cwd)
+            _record("mig-{}.precompute.cold".format(size), _timeit(_cold, heavy_repeat, number=1))
+
+            cache = PrecomputeCache(cache_dir)
+            _load(cache)
+            _record("mig-{}.precompute.warm".format(size), _timeit(lambda: _load(cache), repeat))
+
+            players = {
+                "heuristic-{}".format(size): HeuristicWordlePlayer(wordle, guess_list),
+                "mig-{}".format(size): MaxInformationGainWordlePlayer(
+                    wordle, guess_list, precompute=size, cache=cache)
+            }
+            for name, player in players.items():
+                for turn, (candidates, history, snapshot, guess, response) in enumerate(
+                        _turn_states(player, first_guess, targets), 1):
+                    info = {"candidates": len(candidates)}
+                    player.restore(snapshot)
+                    if hasattr(player, "get_distribution"):
+                        _record("{}.get_distribution.turn{}".format(name, turn),
+                                _timeit(lambda: player.get_distribution(candidates), repeat), **info)
+
+                    def _give_guess():
+                        player.restore(snapshot)
+                        return player.give_guess(player.guess_list, candidates, history)
+                    _give_guess()
+                    _record("{}.give_guess.turn{}".format(name, turn), _timeit(_give_guess, repeat), **info)
+
+                    def _adjust_candidates():
+                        player.restore(snapshot)
+                        return player.adjust_candidates(guess, response, candidates)
+                    _record("{}.adjust_candidates.turn{}".format(name, turn),
+                            _timeit(_adjust_candidates, repeat), **info)
+
+                def _first_guess_performance():
+                    if player.guess_cache is not None:
+                        player.guess_cache.clear()
+                    get_first_guess_performance(wordle, player, first_guess, verbose=False)
+                _record("{}.first_guess_performance".format(name),
+                        _timeit(_first_guess_performance, heavy_repeat, number=1), targets=len(wordle.words))
+
+    from evaluation import play_lockstep
+    for k in lengths:
+        words = random_words(k, 2000, seed=k)
+        _record("k{}.wordle.init".format(k), _timeit(lambda: Wordle(k, words), repeat), words=len(words))
+        wordle_k = Wordle(k, words)
+        _record("k{}.wordle.response_matrix".format(k), _timeit(
+            lambda: wordle_k.response_matrix(words, words), heavy_repeat, number=1))
+        with tempfile.TemporaryDirectory() as cache_dir:
+            players = {
+                "heuristic": HeuristicWordlePlayer(wordle_k, words),
+                "mig": MaxInformationGainWordlePlayer(
+                    wordle_k, words, precompute="random{}".format(k), cache=PrecomputeCache(cache_dir))
+            }
+            players["mig"].reset()
+            for name, player in players.items():
+                def _play():
+                    if player.guess_cache is not None:
+                        player.guess_cache.clear()
+                    play_lockstep(player, None, words[::10])
+                _record("k{}.{}.play".format(k, name), _timeit(_play, heavy_repeat, number=1),
+                        targets=len(words[::10]))
+
+    return {"machine": machine_info(), "benchmarks": results}
+
+
+def compare_benchmarks(results, baseline, threshold=1.25, key="min"):
+    """
+        Compare the timings of the benchmarks in both runs
+            (by the fastest run by default, the least affected by noise)
+
+        Return:
+            a list of (name, baseline timing, timing, ratio) of the benchmarks
+            that are slower than <threshold> times the baseline
+    """
+    regressions = []
+    for name, timing in results["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            continue
+        base = baseline["benchmarks"][name][key]
+        ratio = timing[key] / base if base > 0 else float("inf")
+        if ratio > threshold:
+            regressions.append((name, base, timing[key], ratio))
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Benchmarks of the Wordle Solvers')
+    parser.add_argument(
+        "--output", default=None,
+        help="The JSON file to save the results, default output/benchmark_<time>.json")
+    parser.add_argument(
+        "--baseline", default=None,
+        help="A JSON file of previous results, fail if any benchmark is slower than the threshold")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25,
+        help="The maximum ratio of a min timing (the fastest run) to the baseline, default 1.25")
+    parser.add_argument(
+        "--repeat", type=int, default=5,
+        help="The number of runs of each fast benchmark, default 5")
+    parser.add_argument(
+        "--heavy_repeat", type=int, default=1,
+        help="The number of runs of the precompute and first guess performance benchmarks, default 1")
+    parser.add_argument(
+        "--startup_budget", type=float, default=1.0,
+        help="The maximum seconds of main.py to show the first suggestion, default 1.0")
+    parser.add_argument(
+        "--skip_large", action="store_true",
+        help="If specified, skip the solvers with the large guess list")
+    parser.add_argument(
+        "--lengths", type=int, nargs="*", default=list(range(3, 13)),
+        help="The word lengths to benchmark on random words, default 3 to 12")
+    parser.add_argument(
+        "--first_guess", default="raise",
+        help="The first guess of the played games, default 'raise'")
+
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        large=not args.skip_large, repeat=args.repeat, heavy_repeat=args.heavy_repeat, lengths=args.lengths,
+        first_guess=args.first_guess)
+
+    output_path = args.output or _get_output_path("output", "benchmark", time.strftime("%Y%m%d_%H%M%S")) + ".json"
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2)
+        print("{} saved.".format(f.name))
+
+    slow_startups = [(name, timing["median"]) for name, timing in results["benchmarks"].items()
+                     if name.startswith("main.startup.") and timing["median"] > args.startup_budget]
+    for name, seconds in slow_startups:
+        print("OVER BUDGET {}: {:.3f} s > {:.3f} s".format(name, seconds, args.startup_budget))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_benchmarks(results, baseline, args.threshold)
+        for name, base, fastest, ratio in regressions:
+            print("REGRESSION {}: min {:.3f} ms -> {:.3f} ms ({:.2f}x)".format(
+                name, base * 1000, fastest * 1000, ratio))
+        if not regressions:
+            print("No regression beyond {:.2f}x of {}.".format(args.threshold, args.baseline))
+    if slow_startups or regressions:
+        sys.exit(1)
@@ -0,0 +1,520 @@
+import os
+import time
+import heapq
+import random
+import statistics
+import multiprocessing
+import numpy as np
+from WordlePolicy import WordlePolicy
+from GuessCache import GuessCache
+
+# the player of each worker process, set once by _init_worker
+_worker_player = None
+# the shared pruning threshold of rank_first_guesses, set once by _init_worker
+_worker_threshold = None
+
+
+def _init_worker(player, threshold=None):
+    """
+        Set the player (and the shared threshold) of a worker process
+            (inherited when forked, otherwise unpickled once per worker)
+    """
+    global _worker_player, _worker_threshold
+    _worker_player = player
+    _worker_threshold = threshold
+
+
+def _play_chunk(task):
+    """
+        Play all targets of a task with its first guess in a worker process
+    """
+    first_guess, targets, hard_mode = task
+    return play_lockstep(_worker_player, first_guess, targets, hard_mode)
+
+
+def play_lockstep(player, first_guess, targets=None, hard_mode=False):
+    """
+        Play the games of all targets together, one turn at a time
+
+            the games still sharing the same game state (candidates and previous guesses)
+            are advanced as one group: the guess is picked once per group (see BaseWordlePlayer.pick_guess),
+            the responses of all its targets are looked up at once (see BaseWordlePlayer.get_response_codes),
+            and the group is split by the response codes, adjusting the candidates once per new group
+
+            the player is restored to the state of each group before use (see BaseWordlePlayer.snapshot),
+            so the results are identical to playing the games one after another
+
+        Parameters:
+            targets: (list of str)
+                default all words of the Wordle list
+            hard_mode: (boolean)
+                set to True to only guess words consistent with all previous hints
+
+        Return:
+            a list of (num_guess, trace) for each target (see BaseWordlePlayer.play),
+            or None for a failed game
+
+        Runtime: num_states * O(give_guess + adjust_candidates) + O(num_guess * len(targets))
+    """
+    wordle = player.wordle
+    if targets is None:
+        targets = wordle.words
+    word_idx = {word: idx for idx, word in enumerate(wordle.words)}
+    target_idx = np.array([word_idx[player.lowercase(target)] for target in targets], dtype=np.intp)
+    first_guess = player.lowercase(first_guess)
+    solved = wordle.encode_response(wordle.rformat[2] * wordle.k)
+
+    results = [None] * len(targets)
+    traces = [[] for _ in targets]
+    profiler = player.profiler
+    player.reset()
+    # each group: candidates, previous guesses, legal guesses in hard mode, snapshot of the player,
+    # positions of its targets
+    groups = [(np.arange(len(wordle.words)), frozenset(), player.constraint_index.all() if hard_mode else None,
+               player.snapshot(), np.arange(len(targets)))]
+    num_guess = 0
+    while groups:
+        num_guess += 1
+        next_groups = []
+        for candidates, history, legal, snapshot, members in groups:
+            if profiler is not None:
+                profiler.begin_turn(num_guess, len(candidates))
+            player.restore(snapshot)
+            guess, _ = player.pick_guess(
+                candidates, set(history), fixed_guess=first_guess if num_guess == 1 else None, legal=legal)
+            start = time.perf_counter() if profiler is not None else None
+            codes = player.get_response_codes(guess, target_idx[members])
+            if start is not None:
+                profiler.record("get_response", start)
+            history = history | {guess}
+            for code in np.unique(codes):
+                response = wordle.decode_response(code)
+                group = members[codes == code]
+                for i in group:
+                    traces[i].append((guess, response))
+                if code == solved:
+                    for i in group:
+                        results[i] = (num_guess, traces[i])
+                    continue
+                start = time.perf_counter() if profiler is not None else None
+                player.restore(snapshot)
+                new_candidates = player.adjust_candidates(guess, response, candidates)
+                if start is not None:
+                    profiler.record("adjust_candidates", start)
+                if len(new_candidates):
+                    next_legal = None if legal is None else player.constraint_index.constrain(legal, guess, response)
+                    next_groups.append((new_candidates, history, next_legal, player.snapshot(), group))
+            if profiler is not None:
+                profiler.end_turn()
+        groups = next_groups
+    return results
+
+
+def worst_case(player, first_guess=None, hard_mode=False):
+    """
+        Find the worst case of a deterministic player with the first guess,
+            as a game against an adversary that answers each guess with the response
+            leaving the most remaining guesses (i.e. a minimax over the partitions of the candidates
+            by the response codes of each guess)
+
+            the subtree of each game state (candidates and previous guesses) is solved once,
+            also when reached by the same guesses in another order,
+            and a single candidate is solved by the next guess without asking the player
+            if the player picks its guesses among the candidates (see BaseWordlePlayer.should_pick_from)
+
+            the result is the same as the maximum of playing every target,
+            but each game state is visited once instead of once per target
+
+        Parameters:
+            hard_mode: (boolean)
+                set to True to only guess words consistent with all previous hints
+
+        Return:
+            the worst-case number of guesses (int)
+            the list of (target, trace) of every target that takes the worst-case number of guesses
+                (see BaseWordlePlayer.play)
+
+        Runtime: num_states * O(give_guess + adjust_candidates)
+    """
+    wordle = player.wordle
+    solved = wordle.encode_response(wordle.rformat[2] * wordle.k)
+    correct = wordle.rformat[2] * wordle.k
+    memo = {}
+
+    def _solve(candidates, history, legal, snapshot, fixed_guess):
+        """
+            Return the worst-case number of guesses from a game state,
+                and the (target idx, trace) of the targets that take them
+        """
+        key = GuessCache.fingerprint(candidates, history, fixed_guess, hard_mode)
+        if key in memo:
+            return memo[key]
+        player.restore(snapshot)
+        guess, _ = player.pick_guess(candidates, set(history), fixed_guess=fixed_guess, legal=legal)
+        codes = player.get_response_codes(guess, candidates)
+        depth, witnesses = 0, []
+        for code in np.unique(codes):
+            response = wordle.decode_response(code)
+            if code == solved:
+                sub_depth, sub_witnesses = 0, [(int(candidates[codes == code][0]), [])]
+            elif np.count_nonzero(codes == code) == 1 and player.should_pick_from(candidates[codes == code]):
+                target = int(candidates[codes == code][0])
+                sub_depth, sub_witnesses = 1, [(target, [(wordle.words[target], correct)])]
+            else:
+                player.restore(snapshot)
+                new_candidates = player.adjust_candidates(guess, response, candidates)
+                if not len(new_candidates):
+                    continue
+                new_legal = None if legal is None else player.constraint_index.constrain(legal, guess, response)
+                sub_depth, sub_witnesses = _solve(
+                    new_candidates, history | {guess}, new_legal, player.snapshot(), None)
+            if 1 + sub_depth > depth:
+                depth, witnesses = 1 + sub_depth, []
+            if 1 + sub_depth == depth:
+                witnesses.extend((target, [(guess, response)] + trace) for target, trace in sub_witnesses)
+        memo[key] = depth, witnesses
+        return memo[key]
+
+    player.reset()
+    depth, witnesses = _solve(
+        np.arange(len(wordle.words)), frozenset(), player.constraint_index.all() if hard_mode else None,
+        player.snapshot(), player.lowercase(first_guess))
+    return depth, sorted((wordle.words[target], trace) for target, trace in witnesses)
+
+
+def iter_games(player, first_guesses, targets=None, processes=1, chunk_size=64, hard_mode=False):
+    """
+        Play every target with every first guess,
+            sharded as (first guess, chunk of targets) tasks across a process pool
+
+            each game is independent and deterministic for a given player,
+            so the results are identical to playing them one after another
+
+        the games of each task (all targets of a first guess in this process)
+            are played together in lockstep (see play_lockstep)
+
+        Parameters:
+            first_guesses: (list of str)
+            targets: (list of str)
+                default all words of the Wordle list
+            processes: (int)
+                the number of worker processes, default 1 to play in this process
+                (None to use all CPUs)
+            chunk_size: (int)
+                the number of targets for each task of the process pool
+            hard_mode: (boolean)
+                set to True to only guess words consistent with all previous hints
+
+        Yield:
+            (first_guess, target, num_guess, trace) in the order of first guesses and targets
+    """
+    if targets is None:
+        targets = player.wordle.words
+    if processes == 1:
+        for first_guess in first_guesses:
+            for target, (num_guess, trace) in zip(targets, play_lockstep(player, first_guess, targets, hard_mode)):
+                yield first_guess, target, num_guess, trace
+        return
+
+    tasks = [(first_guess, targets[start: start + chunk_size], hard_mode)
+             for first_guess in first_guesses
+             for start in range(0, len(targets), chunk_size)]
+
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(player,)) as pool:
+        for (first_guess, chunk, _), games in zip(tasks, pool.imap(_play_chunk, tasks)):
+            for target, (num_guess, trace) in zip(chunk, games):
+                yield first_guess, target, num_guess, trace
+
+
+def evaluate_first_guess(player, first_guess, targets=None, threshold=None, hard_mode=False):
+    """
+        Play all targets with the first guess,
+            replayed from a lazily compiled policy of a deterministic player (see WordlePolicy)
+
+            the evaluation is abandoned once the mean number of guesses
+            can no longer get below the threshold:
+            the targets are played grouped by their response to the first guess
+            (larger groups first, as they are the most likely to exceed the bound),
+            and the r unplayed targets of a group need at least 2 + 3(r-1) guesses
+            (at most one of them is picked as the second guess)
+
+        Parameters:
+            threshold: (function)
+                return the current mean to beat, default None (never abandon)
+            hard_mode: (boolean)
+                set to True to only guess words consistent with all previous hints
+
+        Return:
+            a list of the number of guesses for each played target
+            a boolean of whether all targets are played
+    """
+    if targets is None:
+        targets = player.wordle.words
+    solved = player.wordle.rformat[2] * player.wordle.k
+    groups = {}
+    for target in targets:
+        groups.setdefault(player.get_response(first_guess, target), []).append(target)
+
+    def _bound(response, r):
+        return r if response == solved else (3 * r - 1 if r else 0)
+
+    policy = WordlePolicy(player, first_guess, hard_mode)
+    all_guesses, total = [], 0
+    remaining = sum(_bound(response, len(group)) for response, group in groups.items())
+    for response, group in sorted(groups.items(), key=lambda x: -len(x[1])):
+        for i, target in enumerate(group):
+            num_guess, _ = policy.play(target)
+            all_guesses.append(num_guess)
+            total += num_guess
+            remaining -= _bound(response, len(group) - i) - _bound(response, len(group) - i - 1)
+            if threshold is not None and (total + remaining) / len(targets) > threshold():
+                return all_guesses, False
+    return all_guesses, True
+
+
+def _evaluate_first_guess_task(task):
+    """
+        Evaluate a first guess in a worker process with the shared threshold
+    """
+    first_guess, hard_mode = task
+    threshold = None if _worker_threshold is None else (lambda: _worker_threshold.value)
+    return (first_guess,) + evaluate_first_guess(
+        _worker_player, first_guess, threshold=threshold, hard_mode=hard_mode)
+
+
+def rank_first_guesses(player, first_guesses, topK, checkpoint_path, processes=1, progress=None,
+                       hard_mode=False):
+    """
+        Evaluate every first guess and rank them by the mean number of guesses,
+            abandoning a first guess once it can no longer beat the current top-K
+
+            each finished first guess is appended to the checkpoint file as
+            "first_guess\tmean\tmax\tnum_played\tcomplete" (tab-separated),
+            so that a restarted run skips the first guesses already in the file
+
+        Parameters:
+            processes: (int)
+                the number of worker processes, sharing the current threshold
+            progress: (function)
+                wrap the iterator of the results, e.g. tqdm
+            hard_mode: (boolean)
+                set to True to only guess words consistent with all previous hints
+
+        Return:
+            a list of (first_guess, mean, max) of the complete evaluations,
+            ordered by an increasing mean and max
+    """
+    results = read_first_guess_checkpoint(checkpoint_path)
+    _truncate_partial_line(checkpoint_path)
+    done = {first_guess for first_guess, _, _, _, _ in results}
+    todo = [first_guess for first_guess in first_guesses if first_guess not in done]
+    top_means = heapq.nsmallest(topK, [mean for _, mean, _, _, complete in results if complete])
+
+    def _threshold():
+        return top_means[-1] if len(top_means) >= topK else float("inf")
+
+    def _record(f, first_guess, all_guesses, complete):
+        mean, max_guess = sum(all_guesses) / len(all_guesses), max(all_guesses)
+        f.write("\t".join([first_guess, repr(mean), str(max_guess), str(len(all_guesses)), str(int(complete))]) + "\n")
+        f.flush()
+        results.append((first_guess, mean, max_guess, len(all_guesses), complete))
+        if complete:
+            top_means[:] = heapq.nsmallest(topK, top_means + [mean])
+
+    with open(checkpoint_path, "a") as f:
+        if processes == 1:
+            evaluated = ((first_guess,) + evaluate_first_guess(
+                player, first_guess, threshold=_threshold, hard_mode=hard_mode) for first_guess in todo)
+            evaluated = progress(evaluated, total=len(todo)) if progress else evaluated
+            for first_guess, all_guesses, complete in evaluated:
+                _record(f, first_guess, all_guesses, complete)
+        else:
+            shared = multiprocessing.Value("d", _threshold(), lock=False)
+            with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(player, shared)) as pool:
+                evaluated = pool.imap_unordered(
+                    _evaluate_first_guess_task, [(first_guess, hard_mode) for first_guess in todo])
+                evaluated = progress(evaluated, total=len(todo)) if progress else evaluated
+                for first_guess, all_guesses, complete in evaluated:
+                    _record(f, first_guess, all_guesses, complete)
+                    shared.value = _threshold()
+
+    return sorted([(first_guess, mean, max_guess) for first_guess, mean, max_guess, _, complete in results if complete],
+                  key=lambda x: (x[1], x[2], x[0]))
+
+
+def read_first_guess_checkpoint(checkpoint_path):
+    """
+        Read the results saved by rank_first_guesses
+
+        Return:
+            a list of (first_guess, mean, max, num_played, complete)
+    """
+    results = []
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            for line in f:
+                splits = line.rstrip("\n").split("\t")
+                if not line.endswith("\n") or len(splits) != 5:
+                    # an interrupted write
+                    continue
+                first_guess, mean, max_guess, num_played, complete = splits
+                results.append((first_guess, float(mean), int(max_guess), int(num_played), complete == "1"))
+    return results
+
+
+def _truncate_partial_line(path):
+    """
+        Remove an unfinished last line (from an interrupted write) of a text file
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        content = f.read()
+        if content and not content.endswith(b"\n"):
+            f.truncate(content.rfind(b"\n") + 1)
+
+
+def _stratified_estimate(sizes, counts, sums, squares, z):
+    """
+        The stratified mean of the sampled values (e.g. numbers of guesses) and its confidence interval
+
+            the variance within the strata is pooled over all strata
+            (the variance of all samples until a stratum has two samples),
+            the mean of an unsampled stratum is the mean of all samples,
+            and fully sampled strata have no variance (finite population correction)
+
+        Parameters:
+            sizes, counts, sums, squares: (array)
+                the number of targets, the number of samples, the sum and the sum of squares
+                of the sampled values of each stratum
+            z: (float)
+                the normal quantile of the confidence
+
+        Return:
+            the mean and the lower and upper bounds of its confidence interval
+    """
+    weights = sizes / sizes.sum()
+    num_samples = counts.sum()
+    overall_mean = sums.sum() / num_samples
+    means = np.where(counts > 0, sums / np.maximum(counts, 1), overall_mean)
+    dof = np.maximum(counts - 1, 0).sum()
+    if dof > 0:
+        variance = max(0.0, float((squares - counts * means ** 2).sum()) / dof)
+    elif num_samples > 1:
+        variance = max(0.0, (squares.sum() - num_samples * overall_mean ** 2) / (num_samples - 1))
+    else:
+        variance = float("inf")
+    with np.errstate(invalid="ignore"):
+        terms = np.where(counts > 0, variance * (1 - counts / sizes) / np.maximum(counts, 1), variance)
+    mean = float(weights @ means)
+    margin = z * float(np.sqrt(weights ** 2 @ terms))
+    return mean, mean - margin, mean + margin
+
+
+def sample_first_guess(player, first_guess, seed=None, batch_size=32, confidence=0.95, hard_mode=False,
+                       max_strata=32):
+    """
+        Estimate the mean number of guesses of the first guess by playing a sample of targets,
+            stratified by their response to the first guess
+            (the largest <max_strata> - 1 groups of targets by response, and one stratum of the others):
+            each next target is drawn (see Wordle.generate_target) without replacement
+            from a stratum not sampled yet (the largest first),
+            then from the stratum furthest below its share of the samples
+
+            the targets of each batch are played together in lockstep (see play_lockstep)
+
+        Parameters:
+            seed:
+                the seed of the random.Random object drawing the targets
+            batch_size: (int)
+                the number of targets played between two estimates
+            confidence: (float)
+                the confidence level of the intervals
+            hard_mode: (boolean)
+                set to True to only guess words consistent with all previous hints
+
+        Yield:
+            (number of played targets, mean, lower bound, upper bound) after each batch,
+            until every target is played (the exact mean)
+
+        Runtime: O(n) per target drawn + the games of the sampled targets
+    """
+    wordle = player.wordle
+    rng = random.Random(seed)
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    first_guess = player.lowercase(first_guess)
+
+    player.reset()
+    codes = player.get_response_codes(first_guess, np.arange(len(wordle.words)))
+    groups = {}
+    for word, code in zip(wordle.words, codes):
+        groups.setdefault(int(code), []).append(word)
+    groups = sorted(groups.values(), key=len, reverse=True)
+    remaining = groups[:max_strata - 1]
+    if len(groups) >= max_strata:
+        remaining.append([word for group in groups[max_strata - 1:] for word in group])
+    stratum_idx = {word: h for h, words in enumerate(remaining) for word in words}
+    sizes = np.array([len(words) for words in remaining], dtype=float)
+    counts, sums, squares = np.zeros(len(sizes)), np.zeros(len(sizes)), np.zeros(len(sizes))
+    weights = sizes / sizes.sum()
+
+    num_played = 0
+    while num_played < len(wordle.words):
+        targets = []
+        for _ in range(min(batch_size, len(wordle.words) - num_played)):
+            deficits = np.where(counts < sizes, (num_played + len(targets) + 1) * weights - counts, -np.inf)
+            h = int(np.argmax(np.where(counts == 0, np.inf, deficits)))
+            target = wordle.generate_target(rng, remaining[h])
+            remaining[h].remove(target)
+            counts[h] += 1
+            targets.append(target)
+        for target, (num_guess, _) in zip(targets, play_lockstep(player, first_guess, targets, hard_mode)):
+            h = stratum_idx[target]
+            sums[h] += num_guess
+            squares[h] += num_guess ** 2
+        num_played += len(targets)
+        yield (num_played,) + _stratified_estimate(sizes, counts, sums, squares, z)
+
+
+def screen_first_guesses(player, first_guesses, seed=0, tolerance=0.05, confidence=0.95, batch_size=32,
+                         min_samples=64, hard_mode=False, progress=None):
+    """
+        Rank first guesses by their mean number of guesses estimated on sampled targets
+            (see sample_first_guess, with the same seed for every first guess)
+
+            a first guess is sampled until (after at least <min_samples> targets)
+            its confidence interval is above the interval of the current leader (the best mean so far),
+            below the interval of the leader (then it becomes the leader),
+            or narrower than +/- <tolerance>,
+            so that most first guesses are dismissed after a few batches
+
+        Parameters:
+            progress: (function)
+                wrap the iterator of the first guesses, e.g. tqdm
+
+        Return:
+            a list of (first_guess, mean, lower bound, upper bound, number of played targets, status)
+            ordered by an increasing mean, where the status is
+            "worse" or "better" (than the leader), "converged" or "complete" (all targets played)
+    """
+    leader = None
+    results = []
+    for first_guess in (progress(first_guesses) if progress else first_guesses):
+        status = "complete"
+        for num_played, mean, low, high in sample_first_guess(
+                player, first_guess, seed, batch_size, confidence, hard_mode):
+            if num_played == len(player.wordle.words) or num_played < min_samples:
+                continue
+            if leader is not None and low > leader[2]:
+                status = "worse"
+            elif leader is not None and high < leader[1]:
+                status = "better"
+            elif (high - low) / 2 <= tolerance:
+                status = "converged"
+            else:
+                continue
+            break
+        results.append((first_guess, mean, low, high, num_played, status))
+        if leader is None or mean < leader[0]:
+            leader = (mean, low, high)
+    return sorted(results, key=lambda x: (x[1], x[0]))
@@ -1,35 +1,36 @@
-import os
-import numpy as np
 from utility import _bucket_count, _get_output_path
 
+# the parsed word lists, shared by all calls of get_words
+_WORDS = {}
+
 
 def get_words(size="small"):
     """
         small word list: 2315
         extra word list: 12972
+
+        each file is parsed once, and a copy of the list is returned
     """
     if size not in ("small", "large"):
         raise ValueError("choose from size 'small' / 'large")
 
-    words = []
-    with open("data/small.txt") as f:
-        for line in f.readlines():
-            word = line.strip()
-            words.append(word)
+    if "small" not in _WORDS:
+        with open("data/small.txt") as f:
+            _WORDS["small"] = [line.strip() for line in f]
 
-    if size == "small":
-        return words
-    elif size == "large":
+    if size == "large" and "large" not in _WORDS:
+        words = list(_WORDS["small"])
         word_set = set(words)
         with open("data/large.txt") as f:
-            for line in f.readlines():
+            for line in f:
                 extra_word = line.strip()
                 if extra_word not in word_set:
                     words.append(extra_word)
-        return words
+        _WORDS["large"] = words
+    return list(_WORDS[size])
 
 
-def interactive_play(wordle, player, with_target, first_guess=None):
+def interactive_play(wordle, player, with_target, first_guess=None, hard_mode=False):
     print("#" * 50)
     print("### Welcome to the Interactive Mode! ###")
     print("# Wordle Response Format- ", wordle.get_response_description())
@@ -48,14 +49,36 @@ def interactive_play(wordle, player, with_target, first_guess=None):
                 print("#### Generating Target... ####")
                 target = wordle.generate_target()
 
-    player.play(target=target, first_guess=first_guess, verbose=True)
+    player.play(target=target, first_guess=first_guess, verbose=True, hard_mode=hard_mode)
+
+
+def print_turn_profile(turn):
+    """
+        Print the measurements of a turn (see PlayProfiler)
+    """
+    print("[Profile] Turn {}: {} candidates, {:.2f} ms ({}), {} words scored, cache hit: {}".format(
+        turn["turn"], turn["candidates"], turn["total"] * 1000,
+        ", ".join("{} {:.2f} ms".format(name, seconds * 1000) for name, seconds in turn["times"].items()),
+        turn["scored"], turn["cache_hit"]))
 
 
-def get_first_guess_performance(wordle, player, first_guess, verbose=True):
+def get_first_guess_performance(
+        wordle, player, first_guess, verbose=True, processes=1, compiled=False, writer=None, hard_mode=False):
     """
         Use the input first guess word for all possible targets
             and get statistics about the number of guesses
+
+            the games are played across <processes> worker processes
+            (see evaluation.iter_games),
+            or replayed from the compiled policy of the player if <compiled> (see WordlePolicy)
+
+            if a CheckpointWriter is supplied, the number of guesses of each target is checkpointed,
+            and the targets finished in a previous run are skipped
+
+            the games are played in hard mode if <hard_mode> (see ConstraintIndex)
     """
+    from evaluation import iter_games
+    from WordlePolicy import compile_policy
     try:
         from tqdm import tqdm
     except ImportError:
@@ -67,7 +90,7 @@ def get_first_guess_performance(wordle, player, first_guess, verbose=True):
         """
         guess_dict = _bucket_count(all_guesses)
         msg = "Mean: {:.3f}, Min: {}, Max: {}".format(
-            np.mean(all_guesses), min(guess_dict), max(guess_dict))
+            sum(all_guesses) / len(all_guesses), min(guess_dict), max(guess_dict))
         msg += ", Count of Guesses:"
         for i in range(min(guess_dict), max(guess_dict) + 1):
             msg += " [{}] {}".format(i, guess_dict.get(i, 0))
@@ -78,22 +101,43 @@ def get_first_guess_performance(wordle, player, first_guess, verbose=True):
         print("### Checking performance of '{}' as a first guess for all possible targets... ###".format(first_guess))
         print("#" * 50)
 
-    all_guesses = []
-    for target in tqdm(wordle.words):
-        num_guess, trace = player.play(target=target, first_guess=first_guess, verbose=False)
-        all_guesses.append(num_guess)
+    if compiled:
+        all_guesses = compile_policy(player, first_guess, hard_mode).num_guesses()
+    else:
+        finished = {} if writer is None else writer.results
+        all_guesses, targets = [], []
+        for target in wordle.words:
+            key = "\t".join([first_guess, target])
+            if key in finished:
+                all_guesses.append(finished[key])
+            else:
+                targets.append(target)
+        games = iter_games(player, [first_guess], targets, processes=processes, hard_mode=hard_mode)
+        for _, target, num_guess, trace in tqdm(games, total=len(targets)):
+            all_guesses.append(num_guess)
+            if writer is not None:
+                writer.write("\t".join([first_guess, target]), value=num_guess)
     msg = _get_stats(all_guesses)
     if verbose:
         print(msg)
+        if getattr(player, "guess_cache", None) is not None:
+            print(player.guess_cache.stats())
     return msg
 
 
 def check_topK_guesses_performance(
-        wordle, player, topK, output_dir="output", output_name="top_guesses_performance"):
+        wordle, player, topK, output_dir="output", output_name="top_guesses_performance",
+        processes=1, compiled=False, hard_mode=False):
     """
         Iterate the top-K first guess word for all possible targets
             and get statistics about the number of guesses for each first guess
+
+            the progress is checkpointed (see CheckpointWriter),
+            so that a restarted run continues from the unfinished games
+            (saved separately in hard mode)
     """
+    from CheckpointWriter import CheckpointWriter
+
     print("#" * 50)
     print("### Getting scores of all words at first guess ... ###")
     top_guesses = player.print_initial_top_guesses()
@@ -101,54 +145,201 @@ def check_topK_guesses_performance(
     print("### Checking performance of the topK words as a first guess for all possible targets...")
     print("#" * 50)
 
+    if hard_mode:
+        output_name += "_hard_mode"
     obj_name = getattr(player, "precompute", "") + type(player).__name__
     output_path = _get_output_path(output_dir, output_name, obj_name) + ".txt"
-    if not os.path.exists(output_path):
-        open(output_path, "w").close()
-        print("{} created.".format(output_path))
-
-    for top_id in range(topK):
-        first_guess, first_score = top_guesses[top_id]
-        msg = "({}) Guess: {} (Score: {:.2f}), {}".format(
-            top_id, first_guess, first_score, get_first_guess_performance(wordle, player, first_guess), verbose=False)
-        print(msg)
-        with open(output_path, "a") as f:
+
+    with CheckpointWriter(output_path) as writer:
+        for top_id in range(topK):
+            first_guess, first_score = top_guesses[top_id]
+            if first_guess in writer.results:
+                print(writer.results[first_guess])
+                continue
+            msg = "({}) Guess: {} (Score: {:.2f}), {}".format(
+                top_id, first_guess, first_score,
+                get_first_guess_performance(
+                    wordle, player, first_guess, verbose=False,
+                    processes=processes, compiled=compiled, writer=writer, hard_mode=hard_mode))
+            print(msg)
+            writer.write(first_guess, value=msg, line=msg)
+            writer.flush()
+
+
+def check_all_first_guesses_performance(
+        wordle, player, topK, output_dir="output", output_name="all_first_guesses_performance", processes=1,
+        hard_mode=False):
+    """
+        Iterate every word in the guess list as the first guess for all possible targets,
+            abandoning a word once it can no longer beat the current top-K (see evaluation.rank_first_guesses)
+
+            finished words are checkpointed, so that an interrupted run can be resumed,
+            and the ranked results are saved at the end (separately in hard mode)
+    """
+    from evaluation import rank_first_guesses
+    try:
+        from tqdm import tqdm
+    except ImportError:
+        print("Download tqdm to display progress bar in command line")
+
+    print("#" * 50)
+    print("### Checking performance of all words as a first guess for all possible targets...")
+    print("#" * 50)
+
+    if hard_mode:
+        output_name += "_hard_mode"
+    obj_name = getattr(player, "precompute", "") + type(player).__name__
+    checkpoint_path = _get_output_path(output_dir, output_name, obj_name) + ".txt"
+    ranked = rank_first_guesses(
+        player, player.guess_list, topK, checkpoint_path, processes=processes, progress=tqdm, hard_mode=hard_mode)
+
+    output_path = _get_output_path(output_dir, output_name + "_ranked", obj_name) + ".txt"
+    with open(output_path, "w") as f:
+        for rank, (first_guess, mean, max_guess) in enumerate(ranked):
+            msg = "({}) Guess: {}, Mean: {:.3f}, Max: {}".format(rank, first_guess, mean, max_guess)
+            if rank < topK:
+                print(msg)
+            f.write(msg + "\n")
+        print("{} saved.".format(f.name))
+    return ranked
+
+
+def sample_first_guess_performance(
+        wordle, player, first_guess, seed=0, tolerance=0.05, confidence=0.95, hard_mode=False):
+    """
+        Estimate the mean number of guesses of the first guess on sampled targets
+            (see evaluation.sample_first_guess), printing the running mean and its confidence interval
+            until the interval is narrower than +/- <tolerance>
+    """
+    from evaluation import sample_first_guess
+
+    print("#" * 50)
+    print("### Sampling the performance of '{}' as a first guess... ###".format(first_guess))
+    print("#" * 50)
+    for num_played, mean, low, high in sample_first_guess(
+            player, first_guess, seed=seed, confidence=confidence, hard_mode=hard_mode):
+        print("Played: {}/{}, Mean: {:.3f} ({:.0%} CI: {:.3f} - {:.3f})".format(
+            num_played, len(wordle.words), mean, confidence, low, high))
+        if (high - low) / 2 <= tolerance:
+            break
+    return mean, low, high
+
+
+def screen_first_guesses_performance(
+        wordle, player, topK, output_dir="output", output_name="screened_first_guesses",
+        seed=0, tolerance=0.05, hard_mode=False):
+    """
+        Rank every word in the guess list as the first guess on sampled targets,
+            dismissing a word once it is clearly worse than the current best (see evaluation.screen_first_guesses),
+            and save the ranked estimates
+    """
+    from evaluation import screen_first_guesses
+    try:
+        from tqdm import tqdm
+    except ImportError:
+        print("Download tqdm to display progress bar in command line")
+
+    print("#" * 50)
+    print("### Screening all words as a first guess on sampled targets...")
+    print("#" * 50)
+
+    if hard_mode:
+        output_name += "_hard_mode"
+    ranked = screen_first_guesses(
+        player, player.guess_list, seed=seed, tolerance=tolerance, hard_mode=hard_mode, progress=tqdm)
+
+    obj_name = getattr(player, "precompute", "") + type(player).__name__
+    output_path = _get_output_path(output_dir, output_name, obj_name) + ".txt"
+    with open(output_path, "w") as f:
+        for rank, (first_guess, mean, low, high, num_played, status) in enumerate(ranked):
+            msg = "({}) Guess: {}, Mean: {:.3f} (CI: {:.3f} - {:.3f}), Played: {}, {}".format(
+                rank, first_guess, mean, low, high, num_played, status)
+            if rank < topK:
+                print(msg)
             f.write(msg + "\n")
+        print("{} saved.".format(f.name))
+    return ranked
 
 
-def save_trace(wordle, player, first_guess_list, output_dir="output", output_name="traces"):
+def check_worst_case(
+        wordle, player, first_guess, output_dir="output", output_name="worst_case", hard_mode=False):
+    """
+        Find the worst-case number of guesses with the first guess against an adversary
+            that picks the response leaving the most remaining guesses (see evaluation.worst_case),
+            and save the trace of every target that takes it,
+            each line stores "target" and "guess,response" at each step, tab-separated
+    """
+    from evaluation import worst_case
+
+    if hard_mode:
+        output_name += "_hard_mode"
+    print("#" * 50)
+    print("### Checking the worst case of '{}' as a first guess... ###".format(first_guess))
+    print("#" * 50)
+
+    depth, witnesses = worst_case(player, first_guess, hard_mode=hard_mode)
+    print("Worst Case: {} guesses for {} target(s): {}".format(
+        depth, len(witnesses), ", ".join(target for target, _ in witnesses)))
+
+    obj_name = getattr(player, "precompute", "") + type(player).__name__
+    output_path = _get_output_path(output_dir, output_name + "_" + first_guess, obj_name) + ".txt"
+    with open(output_path, "w") as f:
+        for target, trace in witnesses:
+            f.write("\t".join([target] + ["{},{}".format(guess, response) for guess, response in trace]) + "\n")
+        print("{} saved.".format(f.name))
+    return depth, witnesses
+
+
+def save_trace(
+        wordle, player, first_guess_list, output_dir="output", output_name="traces",
+        compiled=False, compress=False, hard_mode=False):
     """
         Saving the traces for each possible target and for each first guess in the input list
             each line stores "idx(guess),encode(response)" at each step, tab-separated
             the end of trace is indicated by "idx(target)"
+
+            the traces are replayed from the compiled policy of the player if <compiled>
+
+            the traces are written in batches and checkpointed (see CheckpointWriter),
+            so that a restarted run skips the traces already saved,
+            and are gzip-compressed if <compress> (saved separately in hard mode)
     """
+    from evaluation import iter_games
+    from WordlePolicy import compile_policy
+    from CheckpointWriter import CheckpointWriter
     try:
         from tqdm import tqdm
     except ImportError:
         print("Download tqdm to display progress bar in command line")
 
+    if hard_mode:
+        output_name += "_hard_mode"
     obj_name = getattr(player, "precompute", "") + type(player).__name__
     output_path = _get_output_path(output_dir, output_name, obj_name) + ".txt"
-    if not os.path.exists(output_path):
-        open(output_path, "w").close()
-        print("{} created.".format(output_path))
 
     word_idx = {word: idx for idx, word in enumerate(player.guess_list)}
-    for first_guess in first_guess_list:
-        print("first guess: ", first_guess)
-        for target in tqdm(wordle.words):
-            num_guess, trace = player.play(target=target, first_guess=first_guess, verbose=False)
-            msg = "\t".join([
-                "{},{}".format(word_idx[guess], wordle.encode_response(response))
-                for guess, response in trace[:-1]] + [str(word_idx[target])])
-            with open(output_path, "a") as f:
-                f.write(msg + "\n")
+    with CheckpointWriter(output_path, compress=compress) as writer:
+        for first_guess in first_guess_list:
+            print("first guess: ", first_guess)
+            targets = [target for target in wordle.words
+                       if "\t".join([first_guess, target]) not in writer.results]
+            if compiled:
+                all_traces = dict(zip(wordle.words, compile_policy(player, first_guess, hard_mode).traces()))
+                traces = (all_traces[target] for target in targets)
+            else:
+                traces = (trace for _, _, _, trace in iter_games(player, [first_guess], targets, hard_mode=hard_mode))
+            for target, trace in zip(targets, tqdm(traces, total=len(targets))):
+                msg = "\t".join([
+                    "{},{}".format(word_idx[guess], wordle.encode_response(response))
+                    for guess, response in trace[:-1]] + [str(word_idx[target])])
+                writer.write("\t".join([first_guess, target]), line=msg)
 
 
 if __name__ == "__main__":
     from Wordle import Wordle
     from HeuristicWordlePlayer import HeuristicWordlePlayer
     from MaxInformationGainWordlePlayer import MaxInformationGainWordlePlayer
+    from LookaheadWordlePlayer import LookaheadWordlePlayer
     import argparse
 
     # solver
@@ -156,13 +347,31 @@ if __name__ == "__main__":
         description='Wordle Solvers in Python!')
 
     parser.add_argument(
-        "--solver", choices=["heuristic", "small-mig", "large-mig"], default="heuristic",
-        help="Specify the solver to use (heuristic/small-mig/large-mig)")
+        "--solver", choices=["heuristic", "small-mig", "large-mig", "lookahead"], default="heuristic",
+        help="Specify the solver to use (heuristic/small-mig/large-mig/lookahead)")
     parser.add_argument(
         "--first_guess", default="raise",
         help="Specify a fixed word for the solver to use in the first guess, default 'raise'")
+    parser.add_argument(
+        "--compile_policy", action="store_true",
+        help="If specified, replay the solver from a decision tree of its guesses for each game state")
+    parser.add_argument(
+        "--precompute_processes", type=int, default=0,
+        help="The number of worker processes to precompute the responses of the mig solvers, "
+             "default 0 to use all CPUs")
+    parser.add_argument(
+        "--time_budget", type=float, default=None,
+        help="The maximum seconds per move of the lookahead solver before it falls back to the greedy guess, "
+             "default unbounded (only bounded by the number of scored words)")
+    parser.add_argument(
+        "--hard_mode", action="store_true",
+        help="If specified, play in hard mode: every guess must be consistent with all previous hints")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="If specified, measure each turn of the games played in this process "
+             "(printed per turn in the interactive mode, summarized and saved as a Chrome trace in the analysis mode)")
 
-    subparsers = parser.add_subparsers(help="usages: interactive/analysis", dest='mode')
+    subparsers = parser.add_subparsers(help="usages: interactive/analysis/serve", dest='mode')
 
     # interactive
     parser_i = subparsers.add_parser("interactive", help="Play Interactively")
@@ -178,6 +387,41 @@ if __name__ == "__main__":
         help="Check the performance of the top-K words with the highest internal solver score")
     parser_a.add_argument(
         "--save_trace", nargs="+", default=None)
+    parser_a.add_argument(
+        "--compress", action="store_true",
+        help="If specified, save the traces gzip-compressed")
+    parser_a.add_argument(
+        "--all_first_guesses", nargs="?", type=int, const=10, default=None,
+        help="Check the performance of every word in the guess list as the first guess, "
+             "ranking the best K (default 10) and skipping words that cannot beat them")
+    parser_a.add_argument(
+        "--sample", action="store_true",
+        help="Estimate the performance of the first guess on sampled targets, with a confidence interval")
+    parser_a.add_argument(
+        "--screen", nargs="?", type=int, const=10, default=None,
+        help="Screen every word in the guess list as the first guess on sampled targets, "
+             "ranking the best K (default 10) and dismissing words clearly worse than the best")
+    parser_a.add_argument(
+        "--seed", type=int, default=0,
+        help="The seed of the sampled targets, default 0")
+    parser_a.add_argument(
+        "--tolerance", type=float, default=0.05,
+        help="The half-width of the 95%% confidence interval to stop sampling at, default 0.05")
+    parser_a.add_argument(
+        "--worst_case", action="store_true",
+        help="Find the worst-case number of guesses of the first guess and the targets that take it")
+    parser_a.add_argument(
+        "--processes", type=int, default=1,
+        help="The number of worker processes to play the games, default 1 (0 to use all CPUs)")
+
+    # serve
+    parser_s = subparsers.add_parser("serve", help="Serve the Solver over HTTP")
+    parser_s.add_argument(
+        "--host", default="127.0.0.1",
+        help="The address to listen on, default 127.0.0.1")
+    parser_s.add_argument(
+        "--port", type=int, default=8000,
+        help="The port to listen on, default 8000")
 
     args = parser.parse_args()
 
@@ -191,19 +435,72 @@ if __name__ == "__main__":
 
     elif args.solver == "small-mig":
         print("\n[Loading the Max Information Gain Player]\n")
-        player = MaxInformationGainWordlePlayer(wordle, guess_list=get_words("small"), precompute="small")
+        player = MaxInformationGainWordlePlayer(
+            wordle, guess_list=get_words("small"), precompute="small",
+            precompute_processes=args.precompute_processes or None)
 
     elif args.solver == "large-mig":
         print("\n[Loading the Max Information Gain Player (large word list)]\n")
-        player = MaxInformationGainWordlePlayer(wordle, guess_list=get_words("large"), precompute="large")
+        player = MaxInformationGainWordlePlayer(
+            wordle, guess_list=get_words("large"), precompute="large",
+            precompute_processes=args.precompute_processes or None)
+
+    elif args.solver == "lookahead":
+        print("\n[Loading the Lookahead Player (large word list)]\n")
+        player = LookaheadWordlePlayer(
+            wordle, guess_list=get_words("large"), precompute="large",
+            precompute_processes=args.precompute_processes or None, time_budget=args.time_budget)
 
     if args.mode == "interactive":
-        interactive_play(wordle, player, with_target=args.with_target, first_guess=args.first_guess)
+        if args.compile_policy:
+            from WordlePolicy import WordlePolicy
+            from CompiledWordlePlayer import CompiledWordlePlayer
+            player = CompiledWordlePlayer(WordlePolicy(player, args.first_guess, args.hard_mode))
+        if args.profile:
+            from PlayProfiler import PlayProfiler
+            player.profiler = PlayProfiler(callback=print_turn_profile, keep_events=False)
+        interactive_play(
+            wordle, player, with_target=args.with_target, first_guess=args.first_guess, hard_mode=args.hard_mode)
 
     elif args.mode == "analysis":
-        if args.topK:
-            check_topK_guesses_performance(wordle, player, topK=int(args.topK))
+        processes = args.processes or None
+        if args.profile:
+            from PlayProfiler import PlayProfiler
+            player.profiler = PlayProfiler()
+        if args.all_first_guesses:
+            check_all_first_guesses_performance(
+                wordle, player, topK=args.all_first_guesses, processes=processes, hard_mode=args.hard_mode)
+        elif args.topK:
+            check_topK_guesses_performance(
+                wordle, player, topK=int(args.topK), processes=processes, compiled=args.compile_policy,
+                hard_mode=args.hard_mode)
+        elif args.screen:
+            screen_first_guesses_performance(
+                wordle, player, topK=args.screen, seed=args.seed, tolerance=args.tolerance, hard_mode=args.hard_mode)
+        elif args.sample:
+            sample_first_guess_performance(
+                wordle, player, first_guess=args.first_guess, seed=args.seed, tolerance=args.tolerance,
+                hard_mode=args.hard_mode)
+        elif args.worst_case:
+            check_worst_case(wordle, player, first_guess=args.first_guess, hard_mode=args.hard_mode)
         elif args.save_trace:
-            save_trace(wordle, player, first_guess_list=args.save_trace)
+            save_trace(
+                wordle, player, first_guess_list=args.save_trace,
+                compiled=args.compile_policy, compress=args.compress, hard_mode=args.hard_mode)
         elif args.first_guess:
-            get_first_guess_performance(wordle, player, first_guess=args.first_guess)
+            get_first_guess_performance(
+                wordle, player, first_guess=args.first_guess, processes=processes, compiled=args.compile_policy,
+                hard_mode=args.hard_mode)
+        if args.profile:
+            print(player.profiler.format_summary())
+            player.profiler.export_chrome_trace(_get_output_path(
+                "output", "profile", getattr(player, "precompute", "") + type(player).__name__) + ".json")
+
+    elif args.mode == "serve":
+        from SolverService import SolverService
+        from server import serve
+        import asyncio
+
+        asyncio.run(serve(
+            SolverService(player, first_guess=args.first_guess, hard_mode=args.hard_mode),
+            host=args.host, port=args.port))
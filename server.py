@@ -0,0 +1,127 @@
+import json
+import time
+import asyncio
+from SolverService import UnknownSessionError
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}
+# the maximum size of a request body in bytes
+_MAX_BODY = 2 ** 16
+
+
+def _dispatch(service, method, path, body):
+    """
+        Route a request to the solver service (see SolverService)
+
+            POST   /games        start a session
+            POST   /games/<id>   submit {"guess", "response"} and get the next guess
+            GET    /games/<id>   the state of a session
+            DELETE /games/<id>   close a session
+            GET    /stats        the open sessions and the latency percentiles per route
+
+        Return:
+            the status code, the JSON payload and the route name
+    """
+    parts = [part for part in path.split("?")[0].split("/") if part]
+    if parts == ["games"]:
+        if method == "POST":
+            return 200, service.start(), "start"
+        return 405, {"error": "method not allowed"}, "invalid"
+    if len(parts) == 2 and parts[0] == "games":
+        try:
+            if method == "POST":
+                data = json.loads(body or b"{}")
+                if not isinstance(data, dict):
+                    raise ValueError("the request body must be a JSON object")
+                return 200, service.observe(parts[1], data.get("guess"), data.get("response")), "observe"
+            if method == "GET":
+                return 200, service.status(parts[1]), "status"
+            if method == "DELETE":
+                return 200, service.end(parts[1]), "end"
+        except UnknownSessionError as e:
+            return 404, {"error": str(e)}, "invalid"
+        except ValueError as e:
+            return 400, {"error": str(e)}, "invalid"
+        return 405, {"error": "method not allowed"}, "invalid"
+    if parts == ["stats"] and method == "GET":
+        return 200, service.stats(), "stats"
+    return 404, {"error": "not found"}, "invalid"
+
+
+def _encode_response(status, payload, keep_alive):
+    body = json.dumps(payload).encode("utf-8")
+    head = "HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: {}\r\n\r\n".format(
+        status, _REASONS[status], len(body), "keep-alive" if keep_alive else "close")
+    return head.encode("latin-1") + body
+
+
+async def _handle_connection(service, reader, writer):
+    """
+        Serve the HTTP/1.1 requests of a connection one after another (keep-alive),
+            recording the latency of each request from its parsed body to its response
+    """
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, path, version = request_line.decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+            length = int(headers.get("content-length", 0))
+            if length > _MAX_BODY:
+                writer.write(_encode_response(413, {"error": "payload too large"}, False))
+                await writer.drain()
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            start = time.perf_counter()
+            status, payload, route = _dispatch(service, method, path, body)
+            writer.write(_encode_response(status, payload, keep_alive))
+            service.record_latency(route, time.perf_counter() - start)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _report_latency(service, interval):
+    """
+        Print the latency percentiles of each route periodically
+    """
+    while True:
+        await asyncio.sleep(interval)
+        for route, stats in sorted(service.latency_stats().items()):
+            print("[{}] requests: {}, p50: {:.3f} ms, p99: {:.3f} ms".format(
+                route, stats["count"], stats["p50_ms"], stats["p99_ms"]))
+
+
+async def serve(service, host="127.0.0.1", port=8000, report_interval=60):
+    """
+        Serve the solver service over HTTP on an asyncio event loop,
+            all sessions share the player of the service in this process
+
+        Parameters:
+            service: a SolverService object
+            report_interval: (float)
+                the seconds between printing the latency percentiles (None to disable)
+    """
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(service, reader, writer), host, port, backlog=1024)
+    print("Serving on http://{}:{} ...".format(host, port))
+    reporter = asyncio.ensure_future(_report_latency(service, report_interval)) if report_interval else None
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if reporter is not None:
+            reporter.cancel()
@@ -1,4 +1,14 @@
 import os
+import gzip
+import json
+import struct
+import hashlib
+import numpy as np
+
+# binary cache format: magic, header size, json header (padded), raw array
+_CACHE_MAGIC = b"WORDLEPC"
+_CACHE_VERSION = 1
+_CACHE_ALIGN = 64
 
 
 def _bucket_count(li):
@@ -31,6 +41,58 @@ def _get_output_path(output_dir, output_name, suffix):
     return output_path
 
 
+def _hash_words(words):
+    """
+        utility function:
+            get a content hash of a list of words (order-sensitive)
+    """
+    return hashlib.sha1("\n".join(words).encode("utf-8")).hexdigest()
+
+
+def _save_array(path, array, meta):
+    """
+        utility function:
+            save an array in the binary cache format,
+            with the <meta> dict stored in the header for validation
+    """
+    header = dict(meta, version=_CACHE_VERSION, dtype=array.dtype.str, shape=list(array.shape))
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    prefix_size = len(_CACHE_MAGIC) + 8
+    offset = -(-(prefix_size + len(header_bytes)) // _CACHE_ALIGN) * _CACHE_ALIGN
+    with open(path, "wb") as f:
+        f.write(_CACHE_MAGIC)
+        f.write(struct.pack("<Q", offset))
+        f.write(header_bytes.ljust(offset - prefix_size, b" "))
+        np.ascontiguousarray(array).tofile(f)
+
+
+def _load_array(path, meta):
+    """
+        utility function:
+            open an array saved by _save_array as a read-only memory map
+
+        Return:
+            the memory-mapped array,
+            or None if the file is missing, not in the cache format or its header does not match <meta>
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        if f.read(len(_CACHE_MAGIC)) != _CACHE_MAGIC:
+            return None
+        offset = struct.unpack("<Q", f.read(8))[0]
+        try:
+            header = json.loads(f.read(offset - len(_CACHE_MAGIC) - 8).decode("utf-8"))
+        except ValueError:
+            return None
+    if header.get("version") != _CACHE_VERSION or any(header.get(k) != v for k, v in meta.items()):
+        return None
+    dtype, shape = np.dtype(header["dtype"]), tuple(header["shape"])
+    if os.path.getsize(path) != offset + dtype.itemsize * int(np.prod(shape)):
+        return None
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+
 def _txt2dict(path):
     import collections.abc
 
@@ -49,7 +111,8 @@ def _txt2dict(path):
         else:
             return {data[0]: {}}
     d = {}
-    with open(path) as f:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as f:
         for line in f.readlines():
             splits = line.strip().split("\t")
             splits_d = create_nested_dict(splits)
@@ -58,7 +121,6 @@ def _txt2dict(path):
 
 
 if __name__ == "__main__":
-    import json
     for name in ("HeuristicWordlePlayer", "smallMaxInformationGainWordlePlayer"):
         d = _txt2dict("output/traces_{}.txt".format(name))
         with open("output/traces_{}.json".format(name), "w") as f: